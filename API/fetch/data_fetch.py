@@ -11,13 +11,14 @@ The following functions are present:
     * get_feature_null_counts
     * get_current_bracket
 
-Requires a minimum of the 'pandas' and 're' libraries, as well as the 
+Requires a minimum of the 'pandas', 'numpy', and 're' libraries, as well as the 
 'web_scraper_types' helper module, being present in your environment to run.
 """
 
 import pandas as pd
+import numpy as np
 import re
-from web_scraper_types import bs4_web_scrape, pandas_web_scrape, bracket_web_scrape
+from web_scraper_types import pandas_web_scrape, stat_table_web_scrape, bracket_web_scrape
 
 
 def get_team_data(url, attrs, header=1):
@@ -47,30 +48,32 @@ def get_team_data(url, attrs, header=1):
     return teams_df[0]
 
 
-def get_rankings_data(url):
+def get_rankings_data(url, max_rows=None):
     """Fetch team season rankings
 
     Parameters
     ----------
     url : str
         URL path to data
+    max_rows : int, optional
+        Stop reading rankings after this many teams (default=None, all teams); season
+        pipelines need all teams, since merge_clean_rankings() drops unranked teams
 
     Returns
     -------
     rankings_df : DataFrame
         Curated data points read into a DataFrame
     """
-    # Fetch raw data and prepare DataFrame
-    raw_html = bs4_web_scrape(url, attrs={"id": "ratings"})
-    rankings_df = pd.DataFrame(columns=['Team', 'Top_25'])
-
-    # Iterate over raw data to extract team and rank HTML elements
-    for i, rank in enumerate(raw_html):
-        if rank.find('a'):
-            team = rank.find('a')
-            # Identify Top 25 teams using ternary operator to produce binary output
-            rankings_df.loc[i] = [team.text, 1 if (len(rankings_df) < 25) else 0]
-            
+    # Fetch raw data; each team's name is the first link in its row
+    raw_data = stat_table_web_scrape(url, table_id='ratings', data_stats=[], max_rows=max_rows)
+    teams = [links[0] for links in raw_data['links']]
+
+    # Identify Top 25 teams (rankings are listed in order) to produce binary output
+    rankings_df = pd.DataFrame({
+        'Team': teams,
+        'Top_25': (np.arange(len(teams)) < 25).astype(int),
+    })
+
     return rankings_df
 
 
@@ -87,20 +90,18 @@ def get_coach_data(url):
     coaches_df : DataFrame
         Curated data points read into a DataFrame
     """
-    # Fetch raw data and prepare DataFrame
-    raw_html = bs4_web_scrape(url, attrs={"id": "coaches"})
-    coaches_df = pd.DataFrame(columns=['Coach_Team', 'MM', 'S16', 'F4', 'Champs'])
-
-    # Iterate over raw data to extract coach tournament appearances HTML elements
-    for i, row in enumerate(raw_html):
-        if(row.find('a')):
-            coach_team = row.find_all('a')[1]
-            mm_apps = row.find("td", attrs={"data-stat": "ncaa_car"})
-            sw16_apps = row.find("td", attrs={"data-stat": "sw16_car"})
-            f4_apps = row.find("td", attrs={"data-stat": "ff_car"})
-            champ_wins = row.find("td", attrs={"data-stat": "champ_car"})
-
-            coaches_df.loc[i] = [coach_team.text, mm_apps.text, sw16_apps.text, f4_apps.text, champ_wins.text]
+    # Fetch raw data for coach tournament appearances
+    raw_data = stat_table_web_scrape(url, table_id='coaches', 
+                                     data_stats=['ncaa_car', 'sw16_car', 'ff_car', 'champ_car'])
+
+    # Each coach's team is the second link in its row (the first being the coach)
+    coaches_df = pd.DataFrame({
+        'Coach_Team': [links[1] for links in raw_data['links']],
+        'MM': raw_data['ncaa_car'],
+        'S16': raw_data['sw16_car'],
+        'F4': raw_data['ff_car'],
+        'Champs': raw_data['champ_car'],
+    })
 
     return coaches_df.drop_duplicates(subset='Coach_Team', keep='last')
 
@@ -154,26 +155,27 @@ def get_current_bracket(url):
     current_bracket : DataFrame
         Curated data points read into a DataFrame
     """
-    # Fetch raw data and prepare DataFrame
+    # Fetch raw data and prepare matchup rows
     raw_html = bracket_web_scrape(url, attrs={"id": "bracket"})
-    current_bracket = pd.DataFrame(columns=['Seed', 'Team', 'Seed.1', 'Team.1'])
+    matchups = []
 
     # Iterate over raw data to extract team and their seeds
-    for i, game in enumerate(raw_html):
-        game_string = game.find('dt')
+    for game in raw_html:
+        game_string = game.find('.//dt')
 
-        teams = [name['title'] for name in game_string.find_all('a')]
+        teams = [name.get('title') for name in game_string.findall('.//a')]
 
-        seeds = re.findall(r'\d+', game_string.text) 
+        seeds = re.findall(r'\d+', game_string.text_content()) 
         seeds = list(map(int, seeds))
 
         try:
-            # Read team matchups into dataframe
-            current_bracket.loc[i] = [seeds[0], teams[0], seeds[1], teams[1]]
+            # Read team matchups into rows
+            matchups.append([seeds[0], teams[0], seeds[1], teams[1]])
         except IndexError:
             # Catch error where 1st Round awaits First Four winners
             if len(teams) > 0:
-                current_bracket.loc[i] = [seeds[0], teams[0], 0, None]
-                
-    current_bracket.index = range(len(current_bracket))
+                matchups.append([seeds[0], teams[0], 0, None])
+
+    # Build DataFrame from all matchups at once
+    current_bracket = pd.DataFrame(matchups, columns=['Seed', 'Team', 'Seed.1', 'Team.1'])
     return current_bracket
\ No newline at end of file
@@ -0,0 +1,104 @@
+"""HTTP Session Helper Functions
+
+This script is used as a helper module in the web_cache and page_prefetch scripts.
+
+A single keep-alive session is shared by every scraper, so repeated requests to the same
+host reuse pooled connections instead of opening a new TCP/TLS connection each time.
+Throttled (429) and server error (5xx) responses are retried automatically with backoff.
+
+The following functions are present:
+    * configure_session
+    * get_session
+    * http_get
+
+Requires a minimum of the 'requests' and 'urllib3' libraries being present in your environment to run.
+"""
+
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+session_config = {
+    'pool_connections': 10,
+    'pool_maxsize': 10,
+    'timeout': 30,
+    'retries': 4,
+    'backoff_factor': 1.0,
+    'status_forcelist': [429, 500, 502, 503, 504],
+    'headers': {
+        'Accept-Encoding': 'gzip, deflate',
+        'User-Agent': 'Mozilla/5.0 (compatible; march-madness-predictions)',
+    },
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def configure_session(**options):
+    """Update session settings; the session is rebuilt on its next use
+
+    Parameters
+    ----------
+    **options
+        Any keys of 'session_config' (i.e. pool_maxsize, timeout, retries)
+    """
+    global _session
+    unknown = set(options) - set(session_config)
+    if unknown:
+        raise KeyError(f"Unknown session settings: {sorted(unknown)}")
+
+    with _session_lock:
+        session_config.update(options)
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def get_session():
+    """Get the shared HTTP session, creating it on first use
+
+    Returns
+    -------
+    requests.Session
+        Keep-alive session with per-host connection pools and automatic retries
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            retries = Retry(
+                total=session_config['retries'],
+                backoff_factor=session_config['backoff_factor'],
+                status_forcelist=session_config['status_forcelist'],
+                allowed_methods=['GET', 'HEAD'],
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(pool_connections=session_config['pool_connections'],
+                                  pool_maxsize=session_config['pool_maxsize'], max_retries=retries)
+
+            _session = requests.Session()
+            _session.headers.update(session_config['headers'])
+            _session.mount('http://', adapter)
+            _session.mount('https://', adapter)
+
+    return _session
+
+
+def http_get(url, headers=None):
+    """Send a GET request through the shared session
+
+    Parameters
+    ----------
+    url : str
+        URL path to data
+    headers : dict, optional
+        Extra request headers (default=None)
+
+    Returns
+    -------
+    requests.Response
+        Server response (after any retries)
+    """
+    return get_session().get(url, headers=headers, timeout=session_config['timeout'])
@@ -0,0 +1,100 @@
+"""Page Prefetch Helper Functions
+
+This script is used as a helper module in the data_pipeline script.
+
+Pages are downloaded concurrently into the on-disk cache of the 'web_cache' module, so that
+the (serial) fetch, clean, and merge steps afterwards read every page straight from disk.
+Each host gets its own cap on concurrent requests and a minimum delay between requests;
+transient failures are retried with backoff by the shared 'http_session' session.
+
+The following functions are present:
+    * throttled_fetch
+    * prefetch_pages
+
+Requires the 'web_cache' helper module being present in your environment to run.
+"""
+
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+from web_cache import cache_is_fresh, fetch_page
+
+# Per-host politeness: (max concurrent requests, min seconds between request starts)
+host_limits = {
+    'www.sports-reference.com': (2, 3.0),
+}
+default_host_limit = (4, 0.5)
+
+_throttle_lock = threading.Lock()
+_host_semaphores = {}
+_host_next_start = defaultdict(float)
+
+
+def _host_semaphore(host):
+    with _throttle_lock:
+        if host not in _host_semaphores:
+            _host_semaphores[host] = threading.Semaphore(host_limits.get(host, default_host_limit)[0])
+        return _host_semaphores[host]
+
+
+def _wait_for_host(host):
+    # Reserve the host's next request slot, then sleep until it arrives
+    with _throttle_lock:
+        now = time.monotonic()
+        start = max(now, _host_next_start[host])
+        _host_next_start[host] = start + host_limits.get(host, default_host_limit)[1]
+    time.sleep(start - now)
+
+
+def throttled_fetch(url):
+    """Fetch a page into the cache, respecting the host's concurrency and rate limits
+
+    Parameters
+    ----------
+    url : str
+        URL path to data
+
+    Returns
+    -------
+    str
+        Page contents
+    """
+    # Pages already cached don't count against any host's limits
+    if cache_is_fresh(url):
+        return fetch_page(url)
+
+    host = urlparse(url).netloc
+    with _host_semaphore(host):
+        _wait_for_host(host)
+        return fetch_page(url)
+
+
+def prefetch_pages(urls, max_workers=8):
+    """Download many pages concurrently into the page cache
+
+    Parameters
+    ----------
+    urls : list
+        URL paths to data
+    max_workers : int, optional
+        Number of pages fetched at the same time across all hosts (default=8)
+
+    Returns
+    -------
+    failures : dict
+        Errors raised while fetching, keyed by URL (empty if every page was cached)
+    """
+    failures = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(throttled_fetch, url): url for url in dict.fromkeys(urls)}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as error:
+                # Catch all errors; the pipeline refetches (and surfaces) them on use
+                failures[futures[future]] = error
+
+    return failures
@@ -0,0 +1,219 @@
+"""Web Cache Helper Functions
+
+This script is used as a helper module in the web_scraper_types script.
+
+Fetched pages are stored on disk by the hash of their content, with a small metadata
+entry per URL pointing at that content. Pages of past seasons never change, so they are
+served straight from disk; everything else is revalidated with the server (ETag or
+Last-Modified) once its time-to-live runs out. Offline mode serves only from the cache.
+
+The following functions are present:
+    * set_offline_mode
+    * cache_ttl
+    * read_cache_entry
+    * write_cache_entry
+    * cache_is_fresh
+    * fetch_page
+
+Requires the 'http_session' helper module being present in your environment to run.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from http_session import http_get
+
+current_year = datetime.now().year
+
+# Cache location and offline mode can be configured through the environment
+cache_dir = os.environ.get('MM_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'march_madness'))
+offline_mode = os.environ.get('MM_OFFLINE', '0') == '1'
+
+# Seconds before a cached page must be revalidated (None = never); first matching pattern wins
+url_ttls = [
+    (r'espn\.com/.*bracket', 60 * 60),
+]
+default_ttl = 6 * 60 * 60
+
+
+def set_offline_mode(offline=True):
+    """Enable or disable strict offline mode (cache reads only)
+
+    Parameters
+    ----------
+    offline : bool, optional
+        Whether to serve pages from the cache only (default=True)
+    """
+    global offline_mode
+    offline_mode = offline
+
+
+def cache_ttl(url):
+    """Determine how long a cached page stays fresh
+
+    Parameters
+    ----------
+    url : str
+        URL path to data
+
+    Returns
+    -------
+    int or None
+        Seconds before revalidation is needed; None if the page never expires
+    """
+    for pattern, ttl in url_ttls:
+        if re.search(pattern, url):
+            return ttl
+
+    # Pages that only reference past seasons never change
+    years = [int(year) for year in re.findall(r'(?<!\d)(?:19|20)\d{2}(?!\d)', url)]
+    if years and (max(years) < current_year):
+        return None
+
+    return default_ttl
+
+
+def _entry_path(url):
+    return os.path.join(cache_dir, 'urls', hashlib.sha256(url.encode('utf-8')).hexdigest() + '.json')
+
+
+def _content_path(digest):
+    return os.path.join(cache_dir, 'objects', digest[:2], digest + '.html')
+
+
+def _atomic_write(path, data):
+    # Write to a temporary file first so that concurrent readers never see partial files
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _is_fresh(url, entry):
+    ttl = cache_ttl(url)
+    return offline_mode or (ttl is None) or (time.time() - entry['fetched'] < ttl)
+
+
+def read_cache_entry(url):
+    """Read the cached metadata and page text for a URL
+
+    Parameters
+    ----------
+    url : str
+        URL path to data
+
+    Returns
+    -------
+    entry : dict or None
+        Cache metadata with the page text under the 'text' key; None if not cached
+    """
+    try:
+        with open(_entry_path(url), 'r') as f:
+            entry = json.load(f)
+        with open(_content_path(entry['content']), 'rb') as f:
+            entry['text'] = f.read().decode('utf-8')
+    except (FileNotFoundError, ValueError, KeyError):
+        # Catch missing or corrupt cache entries; treat them as a cache miss
+        return None
+
+    return entry
+
+
+def write_cache_entry(url, text, etag=None, last_modified=None):
+    """Store page text and its metadata in the cache
+
+    Parameters
+    ----------
+    url : str
+        URL path to data
+    text : str
+        Page contents
+    etag : str, optional
+        ETag response header used for revalidation (default=None)
+    last_modified : str, optional
+        Last-Modified response header used for revalidation (default=None)
+
+    Returns
+    -------
+    entry : dict
+        Cache metadata with the page text under the 'text' key
+    """
+    # Identical pages share the same stored content
+    content = text.encode('utf-8')
+    digest = hashlib.sha256(content).hexdigest()
+    if not os.path.exists(_content_path(digest)):
+        _atomic_write(_content_path(digest), content)
+
+    entry = {
+        'url': url,
+        'content': digest,
+        'etag': etag,
+        'last_modified': last_modified,
+        'fetched': time.time(),
+    }
+    _atomic_write(_entry_path(url), json.dumps(entry).encode('utf-8'))
+
+    entry['text'] = text
+    return entry
+
+
+def cache_is_fresh(url):
+    """Check whether a URL can be served from the cache without any network access
+
+    Parameters
+    ----------
+    url : str
+        URL path to data
+
+    Returns
+    -------
+    bool
+        True if a cached copy exists that fetch_page() would serve as-is
+    """
+    entry = read_cache_entry(url)
+    return (entry is not None) and _is_fresh(url, entry)
+
+
+def fetch_page(url):
+    """Fetch page text, preferring the on-disk cache
+
+    Parameters
+    ----------
+    url : str
+        URL path to data
+
+    Returns
+    -------
+    str
+        Page contents
+    """
+    entry = read_cache_entry(url)
+
+    # Serve fresh cache entries without touching the network
+    if entry is not None:
+        if _is_fresh(url, entry):
+            return entry['text']
+    elif offline_mode:
+        raise FileNotFoundError(f"{url} is not cached and offline mode is enabled")
+
+    # Revalidate stale entries so unchanged pages aren't downloaded again
+    headers = {}
+    if entry is not None:
+        if entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+
+    page = http_get(url, headers=headers)
+    if (page.status_code == 304) and (entry is not None):
+        entry = write_cache_entry(url, entry['text'], entry['etag'], entry['last_modified'])
+        return entry['text']
+    page.raise_for_status()
+
+    entry = write_cache_entry(url, page.text, page.headers.get('ETag'), page.headers.get('Last-Modified'))
+    return entry['text']
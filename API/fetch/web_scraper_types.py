@@ -1,18 +1,106 @@
 """Web Scraper Helper Functions
 
 This script is used as a helper module in the data_fetch script.
+
+Every page is fetched through the 'web_cache' module (so its freshness checks always apply)
+and each distinct page body is parsed at most once with lxml; scrapers pull their elements
+out of that shared document, or parse only the single element they need when it can be
+located by id.
+
 The following functions are present:
+    * get_document
+    * clear_documents
+    * find_elements
     * pandas_web_scrape
-    * bs4_web_scrape
+    * find_fragment
+    * stat_table_web_scrape
     * bracket_web_scrape
 
-Requires a minimum of the 'pandas', 'requests', and 'BeautifulSoup' 
-libraries being present  in your environment to run.
+Requires a minimum of the 'pandas', 're', 'hashlib', and 'lxml' libraries, as well as the
+'web_cache' helper module, being present in your environment to run.
 """
 
+import hashlib
+import threading
 import pandas as pd
-import requests
-from bs4 import BeautifulSoup
+import re
+import lxml.html
+from collections import OrderedDict
+from io import StringIO
+from web_cache import fetch_page
+
+# Parsed documents, keyed by the digest of the page body they were parsed from
+max_documents = 32
+_documents = OrderedDict()
+_documents_lock = threading.Lock()
+
+
+def get_document(url):
+    """Fetch and parse a webpage; repeated calls reuse the parsed document while the page is unchanged
+
+    Parameters
+    ----------
+    url : str
+        URL path to data
+
+    Returns
+    -------
+    lxml.html.HtmlElement
+        Root element of the parsed webpage
+    """
+    # The page is always fetched through the cache (which revalidates stale pages);
+    # only parsing is skipped when the body is one that's already been parsed
+    text = fetch_page(url)
+    digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    with _documents_lock:
+        if digest in _documents:
+            _documents.move_to_end(digest)
+            return _documents[digest]
+
+    document = lxml.html.fromstring(text)
+
+    with _documents_lock:
+        _documents[digest] = document
+        while len(_documents) > max_documents:
+            _documents.popitem(last=False)
+
+    return document
+
+
+def clear_documents():
+    """Release all parsed documents held in memory"""
+    with _documents_lock:
+        _documents.clear()
+
+
+def find_elements(url, tag, attrs):
+    """Find HTML elements in a webpage's shared document
+
+    Parameters
+    ----------
+    url : str
+        URL path to data
+    tag : str
+        HTML tag of interest
+    attrs : dict
+        characteristics to idenitfy HTML element of interest
+
+    Returns
+    -------
+    list
+        All matching elements, in document order
+    """
+    # Match classes by token (like BeautifulSoup), all other attributes exactly
+    conditions = []
+    for attr, value in attrs.items():
+        if attr == 'class':
+            conditions.append(f"contains(concat(' ', normalize-space(@class), ' '), ' {value} ')")
+        else:
+            conditions.append(f"@{attr}='{value}'")
+
+    predicate = f"[{' and '.join(conditions)}]" if conditions else ''
+    return get_document(url).xpath(f"//{tag}{predicate}")
 
 
 def pandas_web_scrape(url, attrs, header):
@@ -32,39 +120,93 @@ def pandas_web_scrape(url, attrs, header):
     arr : list
         Collection of all webpage data points (by row)
     """
-    # Configure scraper and get table data
-    arr = pd.read_html(url, attrs=attrs, header=header)
+    # Get table elements from shared document; mirror pandas' error when none exist
+    tables = find_elements(url, 'table', attrs)
+    if not tables:
+        raise ValueError(f"No tables found matching {attrs}")
+
+    # Read only the matched tables' markup into DataFrames
+    arr = [pd.read_html(StringIO(lxml.html.tostring(table, encoding='unicode')), header=header)[0]
+           for table in tables]
     return arr
 
 
-def bs4_web_scrape(url, attrs):
-    """BeautifulSoup table web scraper
+def find_fragment(url, tag, element_id):
+    """Parse only a single element (by id) out of a webpage, without parsing the full page
 
     Parameters
     ----------
     url : str
         URL path to data
-    attrs : dict
-        characteristics to idenitfy HTML element of interest
+    tag : str
+        HTML tag of interest
+    element_id : str
+        id attribute of the HTML element of interest
 
     Returns
     -------
-    rows : list
-        Collection of all webpage data points (by row)
+    lxml.html.HtmlElement
+        Parsed element of interest
+    """
+    page = fetch_page(url)
+    start = re.search(rf"""<{tag}\b[^>]*\bid=["']{re.escape(element_id)}["']""", page)
+
+    if start is not None:
+        # Walk the element's opening and closing tags until they balance out
+        depth = 0
+        for match in re.finditer(rf"<(/?){tag}\b", page[start.start():]):
+            depth += -1 if match.group(1) else 1
+            if depth == 0:
+                end = page.find('>', start.start() + match.end())
+                if end != -1:
+                    return lxml.html.fragment_fromstring(page[start.start():end + 1])
+                break
+
+    # Fall back to the shared document if the element's markup couldn't be isolated
+    return find_elements(url, tag, {'id': element_id})[0]
+
+
+def stat_table_web_scrape(url, table_id, data_stats, max_rows=None):
+    """Column-wise table web scraper; reads cells by their 'data-stat' attribute in a single pass
+
+    Parameters
+    ----------
+    url : str
+        URL path to data
+    table_id : str
+        id attribute of the table of interest
+    data_stats : list
+        'data-stat' attributes of the cells to extract from every row
+    max_rows : int, optional
+        Stop reading once this many rows have been extracted (default=None, all rows)
+
+    Returns
+    -------
+    columns : dict
+        List of cell text per data stat, as well as the text of each row's links under 'links'
     """
-    # Configure scraper
-    page = requests.get(url)
-    soup = BeautifulSoup(page.text, "html.parser")
+    table = find_fragment(url, 'table', table_id)
+    columns = {stat: [] for stat in data_stats + ['links']}
 
-    # Find table and get its data
-    table = soup.find("table", attrs=attrs)
-    rows = table.find_all("tr")
+    for row in table.iter('tr'):
+        # Only rows with links hold team data; the rest are repeated headers or spacers
+        links = [link.text_content() for link in row.iter('a')]
+        if not links:
+            continue
 
-    return rows
+        cells = {cell.get('data-stat'): cell for cell in row}
+        for stat in data_stats:
+            columns[stat].append(cells[stat].text_content() if (stat in cells) else '')
+        columns['links'].append(links)
+
+        if (max_rows is not None) and (len(columns['links']) >= max_rows):
+            break
+
+    return columns
 
 
 def bracket_web_scrape(url, attrs):
-    """BeautifulSoup bracket web scraper
+    """lxml bracket web scraper
 
     Parameters
     ----------
@@ -78,12 +220,8 @@ def bracket_web_scrape(url, attrs):
     games : list
         Collection of all tournament game data points (by row)
     """
-    # Configure scraper
-    page = requests.get(url)
-    soup = BeautifulSoup(page.text, "html.parser")
-
     # Find bracket and get its data
-    bracket = soup.find("div", attrs=attrs)
-    games = bracket.find_all("dl")
+    bracket = find_fragment(url, 'div', attrs['id'])
+    games = list(bracket.iter('dl'))
 
-    return games
\ No newline at end of file
+    return games
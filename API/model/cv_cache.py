@@ -0,0 +1,143 @@
+"""CV Cache Helper Functions
+
+This script is used as a helper module in the model_evaluation script.
+
+Fitted CV searches are stored on disk by a fingerprint of everything that determines their
+results: the training data (values & column names), the target variable, the model and its
+parameters, what CV search to perform, the shared CV search settings, the sklearn version, and
+the cache format version (bumped whenever a change to how searches are run would change results).
+Each entry holds the fitted search (cv_results_, refit best_estimator_, etc.) along with its
+model performance summary, so re-evaluating an unchanged model is a load from disk.
+
+The following functions are present:
+    * cv_search_key
+    * load_cv_search
+    * save_cv_search
+    * clear_cv_cache
+
+Requires a minimum of the 'numpy', 'joblib', and 'sklearn' libraries, as well as the
+'model_search' helper module, being present in your environment to run.
+"""
+
+import os
+import shutil
+import threading
+import numpy as np
+import joblib
+import sklearn
+from sklearn.base import clone
+from model_search import search_config
+
+# Cache location can be configured through the environment; an empty MM_CV_CACHE_DIR (or None) disables caching
+default_cv_cache_dir = os.path.join(os.path.expanduser('~'), '.cache', 'march_madness', 'cv_searches')
+cv_cache_dir = os.environ.get('MM_CV_CACHE_DIR', default_cv_cache_dir) or None
+
+# Version of the CV search results; bump it to retire entries fit by an older model_search
+# (or summarized by an older model_evaluation)
+cv_cache_version = 4
+
+
+def cv_search_key(cv_spec, X, y):
+    """Fingerprint a model's CV search
+
+    Parameters
+    ----------
+    cv_spec : list
+        Collection of model, its parameters, and what CV search to perform
+    X : DataFrame
+        Historical tournament training dataset
+    y : list
+        All target variable values
+
+    Returns
+    -------
+    str
+        Hash identifying the CV search's results
+    """
+    columns = list(X.columns) if hasattr(X, 'columns') else None
+
+    return joblib.hash([cv_cache_version, np.asarray(X), columns, np.asarray(y), cv_spec[0], clone(cv_spec[1]),
+                        cv_spec[2], search_config, sklearn.__version__])
+
+
+def _entry_path(cache_dir, key):
+    return os.path.join(cache_dir, key[:2], key + '.joblib')
+
+
+def load_cv_search(cv_spec, X, y, cache_dir=None):
+    """Load a model's fitted CV search, if it was cached
+
+    Parameters
+    ----------
+    cv_spec : list
+        Collection of model, its parameters, and what CV search to perform
+    X : DataFrame
+        Historical tournament training dataset
+    y : list
+        All target variable values
+    cache_dir : str, optional
+        Cache directory (default=None, which uses cv_cache_dir)
+
+    Returns
+    -------
+    tuple
+        Fitted CV search & its model performance summary, or None if not cached
+    """
+    cache_dir = cache_dir or cv_cache_dir
+    if not cache_dir:
+        return None
+
+    path = _entry_path(cache_dir, cv_search_key(cv_spec, X, y))
+    if not os.path.exists(path):
+        return None
+
+    # Unreadable (i.e. partially written or outdated) entries are treated as missing
+    try:
+        entry = joblib.load(path)
+    except Exception:
+        return None
+
+    return entry['search'], entry['performance']
+
+
+def save_cv_search(cv_spec, X, y, model_cv, performance, cache_dir=None):
+    """Cache a model's fitted CV search
+
+    Parameters
+    ----------
+    cv_spec : list
+        Collection of model, its parameters, and what CV search to perform
+    X : DataFrame
+        Historical tournament training dataset
+    y : list
+        All target variable values
+    model_cv : GridSearchCV, RandomizedSearchCV, or HalvingRandomSearchCV
+        Fitted CV search
+    performance : list
+        Model performance summary
+    cache_dir : str, optional
+        Cache directory (default=None, which uses cv_cache_dir)
+    """
+    cache_dir = cache_dir or cv_cache_dir
+    if not cache_dir:
+        return
+
+    # Write to a temporary file first so that concurrent readers never see partial files
+    path = _entry_path(cache_dir, cv_search_key(cv_spec, X, y))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    joblib.dump({'search': model_cv, 'performance': list(performance)}, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def clear_cv_cache(cache_dir=None):
+    """Remove every cached CV search
+
+    Parameters
+    ----------
+    cache_dir : str, optional
+        Cache directory (default=None, which uses cv_cache_dir)
+    """
+    cache_dir = cache_dir or cv_cache_dir
+    if cache_dir and os.path.isdir(cache_dir):
+        shutil.rmtree(cache_dir)
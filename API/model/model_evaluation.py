@@ -8,19 +8,24 @@ The following functions are present:
     * test_model_thresholds
     * get_classification_report
 
-Requires a minimum of the 'pandas', 'numpy', and 'sklearn' libraries being present 
-in your environment to run.
+Requires a minimum of the 'pandas', 'numpy', and 'sklearn' libraries, as well as the
+'model_search' and 'cv_cache' helper modules, being present in your environment to run.
 """
 
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import GridSearchCV, RandomizedSearchCV
 from sklearn.metrics import accuracy_score, roc_auc_score, classification_report
+from model_search import run_cv_searches
+from cv_cache import load_cv_search, save_cv_search
 
 
-def evaluate_cv_models(cv_models, X, y):
+def evaluate_cv_models(cv_models, X, y, n_jobs=-1, verbose=5, use_cache=True, cache_dir=None):
     """Capture stats on model performances against chosen metrics
 
+    All models' CV searches are fit together, sharing one pool of worker processes.
+    Searches cached from an earlier evaluation of the same data, model, and parameters
+    are loaded from disk instead of being fit again.
+
     Parameters
     ----------
     cv_models : dict
@@ -29,39 +34,53 @@ def evaluate_cv_models(cv_models, X, y):
         Historical tournament training dataset
     y : list
         All target variable values
+    n_jobs : int, optional
+        Number of worker processes (default=-1, one per CPU)
+    verbose : int, optional
+        Progress reporting level of the CV searches (default=5)
+    use_cache : bool, optional
+        Whether to load & store CV searches in the CV cache (default=True)
+    cache_dir : str, optional
+        CV cache directory (default=None, which uses cv_cache.cv_cache_dir)
 
     Returns
     -------
     model_performance : DataFrame
         DataFrame of all models' performance
     """
-    # Define CV search parameters and DataFrame to store results
+    # Define DataFrame to store results
     model_performance = pd.DataFrame(columns=['Mean_Accuracy', 'Mean_Accuracy_Std', 'Mean_AUC', 'Mean_AUC_Std'])
-    cross_vals = 4
-    scoring = {
-        'AUC': 'roc_auc', 
-        'Accuracy': 'accuracy',
-    }
-
-    for model, params in cv_models.items():
-        # Determine which CV search to perform, populate parameters accordingly
-        if params[0] == 'Grid':
-            model_cv = GridSearchCV(estimator=params[1], param_grid=params[2], cv=cross_vals, scoring=scoring, refit='AUC')
+
+    # Only models without a cached CV search need to be fit
+    cached = {model: load_cv_search(cv_spec, X, y, cache_dir) if use_cache else None for model, cv_spec in cv_models.items()}
+    uncached_models = {model: cv_spec for model, cv_spec in cv_models.items() if cached[model] is None}
+
+    # Fit every (model, candidate, fold) in one shared pool
+    cv_searches = run_cv_searches(uncached_models, X, y, n_jobs=n_jobs, verbose=verbose) if uncached_models else {}
+
+    for model, cv_spec in cv_models.items():
+        if cached[model] is not None:
+            model_cv, performance = cached[model]
         else:
-            model_cv = RandomizedSearchCV(estimator=params[1], param_distributions=params[2], n_iter=100, 
-                                        cv=cross_vals, scoring=scoring, refit='AUC', random_state=42)
-        # Fit data to model
-        model_cv.fit(X, y)
+            model_cv = cv_searches[model]
+            cv_results = model_cv.cv_results_
+
+            # Halving searches score candidates in rounds; only the final round's were fit on all resources
+            final = cv_results['iter'] == cv_results['iter'].max() if 'iter' in cv_results else slice(None)
+            performance = np.round([
+                cv_results['mean_test_Accuracy'][final].mean(),
+                cv_results['std_test_Accuracy'][final].mean(),
+                cv_results['mean_test_AUC'][final].mean(),
+                cv_results['std_test_AUC'][final].mean(),
+            ], 3)
+            if use_cache:
+                save_cv_search(cv_spec, X, y, model_cv, performance, cache_dir)
+
         # Append model itself to cv_models for later use
         cv_models[model].append(model_cv)
         
         # Store model performance with model key in DataFrame
-        model_performance.loc[model] = np.round([
-            model_cv.cv_results_['mean_test_Accuracy'].mean(),
-            model_cv.cv_results_['std_test_Accuracy'].mean(),
-            model_cv.cv_results_['mean_test_AUC'].mean(),
-            model_cv.cv_results_['std_test_AUC'].mean(),
-        ], 3)
+        model_performance.loc[model] = performance
 
     return model_performance
 
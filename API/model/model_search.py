@@ -0,0 +1,560 @@
+"""Model Search Helper Functions
+
+This script is used as a helper module in the model_evaluation script.
+
+Every cross-validated search in cv_models is broken down into single (model, candidate, fold)
+fits, which are all scheduled together on one pool of worker processes. Workers read the
+training data from a single read-only, memory-mapped copy rather than each receiving their
+own. Results are assembled into the same fitted GridSearchCV/RandomizedSearchCV objects
+(cv_results_, best_estimator_, etc.) that fitting each search one after another produces.
+As in those searches (error_score=np.nan), a fit or scoring that fails is recorded with NaN
+scores and reported in a warning, rather than discarding every other pooled fit.
+
+'Neighbors' searches score a whole grid of n_neighbors values for a KNN model from a single
+neighbor query per fold: the ordered labels of a test point's largest neighborhood hold the
+votes of every smaller neighborhood, so each k is scored from cumulative vote counts. Scores
+match a grid search except where distances tie at a neighborhood's boundary (i.e. duplicate rows).
+
+'Path' searches walk a linear model's grid of C values in increasing order on each fold,
+warm starting every fit from the previous, more regularized solution (where the model supports
+warm starts) and reusing the fold's sliced training & held out data for every C.
+
+'Halving' searches run in rounds of successive halving: every sampled candidate starts with a
+small number of estimators, and only the best third of candidates survive each round to be
+grown (warm started, not refit) to the next, larger number of estimators.
+
+The following functions are present:
+    * search_candidates
+    * halving_resources
+    * create_search
+    * fit_and_score
+    * neighbors_fit_and_score
+    * path_fit_and_score
+    * summarize_cv_results
+    * run_cv_searches
+
+Requires a minimum of the 'numpy', 'scipy', 'joblib', and 'sklearn' libraries being present
+in your environment to run.
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import warnings
+import numpy as np
+from joblib import Parallel, delayed, dump, load
+from scipy.stats import rankdata
+from sklearn.base import clone
+from sklearn.exceptions import FitFailedWarning
+from sklearn.metrics import get_scorer, roc_auc_score, accuracy_score
+from sklearn.model_selection import GridSearchCV, RandomizedSearchCV, ParameterGrid, ParameterSampler, check_cv
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import HalvingRandomSearchCV
+
+# CV search settings shared by all models
+search_config = {
+    'cv': 4,
+    'scoring': {
+        'AUC': 'roc_auc',
+        'Accuracy': 'accuracy',
+    },
+    'refit': 'AUC',
+    'n_iter': 100,
+    'random_state': 42,
+    # Successive halving grows this parameter, keeping 1 / factor of candidates each round
+    'resource': 'n_estimators',
+    'factor': 3,
+}
+
+# Scoring metrics computed from class probabilities alone, for 'Neighbors' searches
+proba_metrics = {
+    'roc_auc': lambda y, probs, classes: roc_auc_score(y, probs[:, 1]),
+    'accuracy': lambda y, probs, classes: accuracy_score(y, classes[probs.argmax(axis=1)]),
+}
+
+
+def search_candidates(cv_spec):
+    """List the parameter settings a model's CV search tries
+
+    Parameters
+    ----------
+    cv_spec : list
+        Collection of model, its parameters, and what CV search to perform
+
+    Returns
+    -------
+    list
+        Parameter settings, in the order GridSearchCV/RandomizedSearchCV would try them
+    """
+    if cv_spec[0] in ['Grid', 'Neighbors', 'Path']:
+        return list(ParameterGrid(cv_spec[2]))
+
+    if cv_spec[0] == 'Halving':
+        # The resource is set by each round rather than sampled
+        params = {name: values for name, values in cv_spec[2].items() if name != search_config['resource']}
+        return list(ParameterSampler(params, n_iter=search_config['n_iter'], random_state=search_config['random_state']))
+
+    return list(ParameterSampler(cv_spec[2], n_iter=search_config['n_iter'], random_state=search_config['random_state']))
+
+
+def halving_resources(cv_spec, n_candidates):
+    """Get the resource (number of estimators) used in each round of a 'Halving' search
+
+    Parameters
+    ----------
+    cv_spec : list
+        Collection of model, its parameters, and what CV search to perform
+    n_candidates : int
+        Number of candidates in the first round
+
+    Returns
+    -------
+    list
+        Resource of each round; the last round uses the largest value in the parameter grid
+    """
+    if ({search_config['resource'], 'warm_start'} - set(cv_spec[1].get_params())) or (search_config['resource'] not in cv_spec[2]):
+        raise ValueError(f"'Halving' searches need a warm-startable model with '{search_config['resource']}' in its parameters")
+
+    # Rounds continue until no more than factor candidates remain (e.g. 100 -> 34 -> 12 -> 4 -> 2)
+    n_rounds = 1
+    while n_candidates > search_config['factor']:
+        n_candidates = -(-n_candidates // search_config['factor'])
+        n_rounds += 1
+
+    max_resources = int(np.max(cv_spec[2][search_config['resource']]))
+
+    return [int(np.ceil(max_resources / search_config['factor']**(n_rounds - 1 - i))) for i in range(n_rounds)]
+
+
+def create_search(cv_spec):
+    """Create the (unfitted) CV search object for a model
+
+    Parameters
+    ----------
+    cv_spec : list
+        Collection of model, its parameters, and what CV search to perform
+
+    Returns
+    -------
+    GridSearchCV, RandomizedSearchCV, or HalvingRandomSearchCV
+        CV search over the model's parameters
+    """
+    if cv_spec[0] in ['Grid', 'Neighbors', 'Path']:
+        return GridSearchCV(estimator=cv_spec[1], param_grid=cv_spec[2], cv=search_config['cv'],
+                            scoring=search_config['scoring'], refit=search_config['refit'])
+
+    if cv_spec[0] == 'Halving':
+        params = {name: values for name, values in cv_spec[2].items() if name != search_config['resource']}
+        resources = halving_resources(cv_spec, search_config['n_iter'])
+        return HalvingRandomSearchCV(estimator=cv_spec[1], param_distributions=params, n_candidates=search_config['n_iter'],
+                                     factor=search_config['factor'], resource=search_config['resource'],
+                                     min_resources=resources[0], max_resources=resources[-1], cv=search_config['cv'],
+                                     scoring=search_config['scoring'], refit=search_config['refit'],
+                                     random_state=search_config['random_state'])
+
+    return RandomizedSearchCV(estimator=cv_spec[1], param_distributions=cv_spec[2], n_iter=search_config['n_iter'],
+                              cv=search_config['cv'], scoring=search_config['scoring'], refit=search_config['refit'],
+                              random_state=search_config['random_state'])
+
+
+def _failed_scores():
+    # Scores recorded for a failed fit or scoring (as with error_score=np.nan)
+    return {metric: np.nan for metric in search_config['scoring']}
+
+
+def _failure(stage, params, error):
+    return f"{stage} failed for parameters {params}:\n{type(error).__name__}: {error}"
+
+
+def fit_and_score(estimator, params, X, y, train, test, warm_start=False):
+    """Fit a single candidate on a single fold, then score it on the held out data
+
+    Parameters
+    ----------
+    estimator : sklearn.base.BaseEstimator
+        Unfitted model, or the candidate's model from the previous round if warm starting
+    params : dict
+        Candidate parameter setting
+    X : ndarray
+        Historical tournament training dataset
+    y : ndarray
+        All target variable values
+    train, test : ndarray
+        Row indices of the fold's training & held out data
+    warm_start : bool, optional
+        Whether to keep growing the given estimator rather than fit a fresh copy (default=False)
+
+    Returns
+    -------
+    scores : dict
+        Held out score of each metric
+    fit_time, score_time : float
+        Seconds spent fitting & scoring
+    model : sklearn.base.BaseEstimator
+        Fitted model to warm start from next round (None when not warm starting, or if fitting failed)
+    failure : str
+        Description of the failed fit or scoring (None if both succeeded); its scores are NaN
+    """
+    start = time.time()
+    try:
+        if warm_start:
+            model = estimator.set_params(warm_start=True, **params).fit(X[train], y[train])
+        else:
+            model = clone(estimator).set_params(**params).fit(X[train], y[train])
+    except Exception as error:
+        return _failed_scores(), time.time() - start, 0.0, None, _failure('Fitting', params, error)
+    fit_time = time.time() - start
+
+    failure = None
+    try:
+        scores = {metric: get_scorer(scorer)(model, X[test], y[test]) for metric, scorer in search_config['scoring'].items()}
+    except Exception as error:
+        scores, failure = _failed_scores(), _failure('Scoring', params, error)
+    score_time = time.time() - start - fit_time
+
+    return scores, fit_time, score_time, (model if warm_start else None), failure
+
+
+def neighbors_fit_and_score(estimator, params, n_neighbors, X, y, train, test):
+    """Fit a KNN model on a single fold, then score several values of n_neighbors on the held out data
+
+    Each k's neighborhood is taken as the first k neighbors of the largest neighborhood. When the
+    k-th and (k+1)-th neighbors are tied in distance (i.e. duplicate rows), a KNN model fit with
+    that k may pick a different one of the tied neighbors, so its scores can differ slightly from
+    a grid search's.
+
+    Parameters
+    ----------
+    estimator : sklearn.neighbors.KNeighborsClassifier
+        Unfitted model
+    params : dict
+        Parameter setting shared by the candidates (besides n_neighbors)
+    n_neighbors : list
+        Candidate values of n_neighbors
+    X : ndarray
+        Historical tournament training dataset
+    y : ndarray
+        All target variable values
+    train, test : ndarray
+        Row indices of the fold's training & held out data
+
+    Returns
+    -------
+    list
+        Output of fit_and_score() for each candidate, in order; the fit time is that of the single
+        shared fit & neighbor query, reported on every candidate
+    """
+    if clone(estimator).set_params(**params).weights != 'uniform':
+        raise ValueError("'Neighbors' searches only support KNN models with uniform weights")
+
+    start = time.time()
+    try:
+        model = clone(estimator).set_params(**params, n_neighbors=max(n_neighbors)).fit(X[train], y[train])
+
+        # Cumulative class votes of each test point's nearest neighbors, nearest first
+        neighbors = model.kneighbors(X[test], return_distance=False)
+    except Exception as error:
+        return [(_failed_scores(), time.time() - start, 0.0, None, _failure('Fitting', {**params, 'n_neighbors': k}, error))
+                for k in n_neighbors]
+    labels = np.searchsorted(model.classes_, y[train])[neighbors]
+    votes = np.cumsum(labels[:, :, np.newaxis] == np.arange(len(model.classes_)), axis=1)
+    fit_time = time.time() - start
+
+    outputs = []
+    for k in n_neighbors:
+        score_start, failure = time.time(), None
+        try:
+            probs = votes[:, k - 1] / k
+            scores = {metric: proba_metrics[scorer](y[test], probs, model.classes_)
+                      for metric, scorer in search_config['scoring'].items()}
+        except Exception as error:
+            scores, failure = _failed_scores(), _failure('Scoring', {**params, 'n_neighbors': k}, error)
+        outputs.append((scores, fit_time, time.time() - score_start, None, failure))
+
+    return outputs
+
+
+def path_fit_and_score(estimator, params, Cs, X, y, train, test):
+    """Fit a linear model along a path of C values on a single fold, scoring each on the held out data
+
+    Parameters
+    ----------
+    estimator : sklearn.base.BaseEstimator
+        Unfitted model
+    params : dict
+        Parameter setting shared by the candidates (besides C)
+    Cs : list
+        Candidate values of C
+    X : ndarray
+        Historical tournament training dataset
+    y : ndarray
+        All target variable values
+    train, test : ndarray
+        Row indices of the fold's training & held out data
+
+    Returns
+    -------
+    list
+        Output of fit_and_score() for each candidate, in order
+    """
+    X_train, y_train, X_test, y_test = X[train], y[train], X[test], y[test]
+
+    # Each fit starts from the previous (more regularized) solution when the model allows it
+    model = clone(estimator).set_params(**params)
+    if 'warm_start' in model.get_params():
+        model.set_params(warm_start=True)
+
+    outputs = {}
+    for C in sorted(set(Cs)):
+        start = time.time()
+        try:
+            model.set_params(C=C).fit(X_train, y_train)
+        except Exception as error:
+            outputs[C] = (_failed_scores(), time.time() - start, 0.0, None, _failure('Fitting', {**params, 'C': C}, error))
+            continue
+        fit_time = time.time() - start
+
+        failure = None
+        try:
+            scores = {metric: get_scorer(scorer)(model, X_test, y_test) for metric, scorer in search_config['scoring'].items()}
+        except Exception as error:
+            scores, failure = _failed_scores(), _failure('Scoring', {**params, 'C': C}, error)
+        outputs[C] = (scores, fit_time, time.time() - start - fit_time, None, failure)
+
+    return [outputs[C] for C in Cs]
+
+
+def summarize_cv_results(candidates, fold_results):
+    """Assemble fold results into the 'cv_results_' format of sklearn's CV searches
+
+    Parameters
+    ----------
+    candidates : list
+        Parameter settings tried
+    fold_results : list
+        Output of fit_and_score() for each fold, for each candidate
+
+    Returns
+    -------
+    cv_results : dict
+        Times, parameters, per-fold scores, mean/std scores & ranks of each candidate;
+        candidates with a failed fold have NaN mean scores and rank last
+    """
+    cv_results = {}
+    for i, key in [(1, 'fit_time'), (2, 'score_time')]:
+        times = np.array([[fold[i] for fold in folds] for folds in fold_results])
+        cv_results['mean_' + key] = times.mean(axis=1)
+        cv_results['std_' + key] = times.std(axis=1)
+
+    # Parameter columns are masked for candidates that don't set that parameter
+    for name in sorted({name for params in candidates for name in params}):
+        column = np.ma.MaskedArray(np.empty(len(candidates), dtype=object), mask=True)
+        for i, params in enumerate(candidates):
+            if name in params:
+                column[i] = params[name]
+        cv_results['param_' + name] = column
+    cv_results['params'] = candidates
+
+    for metric in search_config['scoring']:
+        scores = np.array([[fold[0][metric] for fold in folds] for folds in fold_results])
+        for split in range(scores.shape[1]):
+            cv_results[f"split{split}_test_{metric}"] = scores[:, split]
+
+        cv_results['mean_test_' + metric] = scores.mean(axis=1)
+        cv_results['std_test_' + metric] = scores.std(axis=1)
+        cv_results['rank_test_' + metric] = _rank_scores(cv_results['mean_test_' + metric])
+
+    return cv_results
+
+
+def _rank_scores(mean_scores):
+    # Rank mean scores best first, with NaN scores (failed candidates) tied for last
+    if np.isnan(mean_scores).all():
+        return np.ones(len(mean_scores), dtype=np.int32)
+
+    mean_scores = np.nan_to_num(mean_scores, nan=np.nanmin(mean_scores) - 1)
+    return rankdata(-mean_scores, method='min').astype(np.int32)
+
+
+def _halving_survivors(candidate_ids, mean_scores):
+    # Keep the best 1/factor of a halving round's candidates; ties keep the earlier sampled
+    # candidate, and NaN scores (failed candidates) are kept last
+    n_keep = -(-len(candidate_ids) // search_config['factor'])
+    order = np.argsort(-np.nan_to_num(mean_scores, nan=-np.inf), kind='stable')
+    return [candidate_ids[i] for i in order[:n_keep]]
+
+
+def _refit(estimator, params, X, y):
+    start = time.time()
+    model = clone(estimator).set_params(**params).fit(X, y)
+    return model, time.time() - start
+
+
+# Searches that score all values of one parameter (sharing the other parameters) in a single task per fold
+grouped_searches = {
+    'Neighbors': ('n_neighbors', neighbors_fit_and_score),
+    'Path': ('C', path_fit_and_score),
+}
+
+
+def run_cv_searches(cv_models, X, y, n_jobs=-1, verbose=5):
+    """Fit every model's CV search, pooling all (model, candidate, fold) fits across processes
+
+    Grid, random, neighbors, and path searches fit all their candidates in the first round of fits;
+    'Halving' searches take one round per resource level.
+
+    Parameters
+    ----------
+    cv_models : dict
+        Collection of model, its parameters, and what CV search to perform
+    X : DataFrame
+        Historical tournament training dataset
+    y : list
+        All target variable values
+    n_jobs : int, optional
+        Number of worker processes (default=-1, one per CPU)
+    verbose : int, optional
+        Progress reporting level of the worker pool (default=5)
+
+    Returns
+    -------
+    cv_searches : dict
+        Fitted CV search object of each model
+    """
+    folds = list(check_cv(search_config['cv'], y, classifier=True).split(X, y))
+    candidates = {model: search_candidates(cv_spec) for model, cv_spec in cv_models.items()}
+    resources = {model: halving_resources(cv_spec, len(candidates[model]))
+                 for model, cv_spec in cv_models.items() if cv_spec[0] == 'Halving'}
+
+    # Every model's tried (candidate ID, parameters, fold results, round), in the order tried
+    tried = {model: [] for model in cv_models}
+    failures = {model: [] for model in cv_models}
+
+    # Workers share a single read-only, memory-mapped copy of the training data
+    mmap_dir = tempfile.mkdtemp(prefix='cv_searches_')
+    try:
+        dump(np.asarray(X), os.path.join(mmap_dir, 'X.joblib'))
+        dump(np.asarray(y), os.path.join(mmap_dir, 'y.joblib'))
+        X_mmap = load(os.path.join(mmap_dir, 'X.joblib'), mmap_mode='r')
+        y_mmap = load(os.path.join(mmap_dir, 'y.joblib'), mmap_mode='r')
+
+        with Parallel(n_jobs=n_jobs, verbose=verbose) as parallel:
+            remaining = {model: list(range(len(model_candidates))) for model, model_candidates in candidates.items()}
+            warm_models = {}
+            search_round = 0
+
+            while remaining:
+                # Schedule this round's fits of every model still searching
+                tasks, jobs = [], []
+                for model, candidate_ids in remaining.items():
+                    cv_spec = cv_models[model]
+                    halving = cv_spec[0] == 'Halving'
+                    if cv_spec[0] in grouped_searches:
+                        # One task per fold scores every value of the searched parameter sharing the other parameters
+                        searched, group_fit_and_score = grouped_searches[cv_spec[0]]
+                        groups = {}
+                        for candidate_id in candidate_ids:
+                            params = {name: value for name, value in candidates[model][candidate_id].items() if name != searched}
+                            groups.setdefault(repr(sorted(params.items())), (params, []))[1].append(candidate_id)
+                        for params, group_ids in groups.values():
+                            values = [candidates[model][candidate_id][searched] for candidate_id in group_ids]
+                            for fold, (train, test) in enumerate(folds):
+                                tasks.append((model, group_ids, fold))
+                                jobs.append(delayed(group_fit_and_score)(cv_spec[1], params, values, X_mmap, y_mmap, train, test))
+                        continue
+
+                    for candidate_id in candidate_ids:
+                        params = candidates[model][candidate_id]
+                        if halving:
+                            params = {**params, search_config['resource']: resources[model][search_round]}
+                        for fold, (train, test) in enumerate(folds):
+                            if (model, candidate_id, fold) in warm_models:
+                                estimator = warm_models[(model, candidate_id, fold)]
+                            else:
+                                estimator = clone(cv_spec[1]) if halving else cv_spec[1]
+                            tasks.append((model, [candidate_id], fold))
+                            jobs.append(delayed(fit_and_score)(estimator, params, X_mmap, y_mmap, train, test, halving))
+
+                outputs = parallel(jobs)
+
+                # Regroup fold results by model & candidate
+                round_results = {}
+                for (model, task_ids, fold), output in zip(tasks, outputs):
+                    for candidate_id, candidate_output in zip(task_ids, output if isinstance(output, list) else [output]):
+                        round_results.setdefault((model, candidate_id), []).append(candidate_output[:3])
+                        if candidate_output[3] is not None:
+                            warm_models[(model, candidate_id, fold)] = candidate_output[3]
+                        if candidate_output[4] is not None:
+                            failures[model].append(candidate_output[4])
+                for model, candidate_ids in remaining.items():
+                    for candidate_id in candidate_ids:
+                        params = candidates[model][candidate_id]
+                        if model in resources:
+                            params = {**params, search_config['resource']: resources[model][search_round]}
+                        tried[model].append((candidate_id, params, round_results[(model, candidate_id)], search_round))
+
+                # Halving searches keep their best candidates for the next round
+                next_remaining = {}
+                for model, candidate_ids in remaining.items():
+                    if (model in resources) and (search_round + 1 < len(resources[model])):
+                        scores = [np.mean([fold[0][search_config['refit']] for fold in round_results[(model, candidate_id)]])
+                                  for candidate_id in candidate_ids]
+                        next_remaining[model] = _halving_survivors(candidate_ids, scores)
+
+                warm_models = {key: fitted for key, fitted in warm_models.items() if key[1] in next_remaining.get(key[0], [])}
+                remaining = next_remaining
+                search_round += 1
+
+            # Failed fits are kept as NaN scores (unless every fit of a model failed)
+            for model, model_failures in failures.items():
+                if model_failures:
+                    n_fits = sum(len(fold_results) for _, _, fold_results, _ in tried[model])
+                    n_failed_fits = sum(failure.startswith('Fitting') for failure in model_failures)
+                    if n_failed_fits == n_fits:
+                        raise ValueError(f"All the {n_fits} fits of {model} failed:\n" + "\n".join(sorted(set(model_failures))))
+                    warnings.warn(f"{len(model_failures)} of the {n_fits} fits of {model} failed, and their scores "
+                                  f"were set to NaN:\n" + "\n".join(sorted(set(model_failures))), FitFailedWarning)
+
+            # Summarize each model's tried candidates, and pick its best from its final round
+            cv_results, best_indexes = {}, {}
+            for model, model_tried in tried.items():
+                cv_results[model] = summarize_cv_results([params for _, params, _, _ in model_tried],
+                                                         [fold_results for _, _, fold_results, _ in model_tried])
+                iters = np.array([search_round for _, _, _, search_round in model_tried])
+                if model in resources:
+                    cv_results[model]['iter'] = iters
+                    cv_results[model]['n_resources'] = np.array(resources[model])[iters]
+
+                final = np.flatnonzero(iters == iters.max())
+                final_scores = cv_results[model]['mean_test_' + search_config['refit']][final]
+                best_indexes[model] = final[0] if np.isnan(final_scores).all() else final[np.nanargmax(final_scores)]
+
+            # Refit each model's best candidate on all data (keeping feature names)
+            refits = parallel(delayed(_refit)(cv_models[model][1], cv_results[model]['params'][best_indexes[model]], X, y)
+                              for model in cv_models)
+    finally:
+        shutil.rmtree(mmap_dir, ignore_errors=True)
+
+    # Populate each CV search object as if it was fitted on its own
+    cv_searches = {}
+    for (model, cv_spec), (best_estimator, refit_time) in zip(cv_models.items(), refits):
+        best_index = best_indexes[model]
+        model_cv = create_search(cv_spec)
+        model_cv.cv_results_ = cv_results[model]
+        model_cv.best_index_ = best_index
+        model_cv.best_params_ = cv_results[model]['params'][best_index]
+        model_cv.best_score_ = cv_results[model]['mean_test_' + search_config['refit']][best_index]
+        model_cv.best_estimator_ = best_estimator
+        model_cv.refit_time_ = refit_time
+        model_cv.scorer_ = {metric: get_scorer(scorer) for metric, scorer in search_config['scoring'].items()}
+        model_cv.multimetric_ = True
+        model_cv.n_splits_ = len(folds)
+        if model in resources:
+            model_cv.n_resources_ = resources[model]
+            model_cv.n_candidates_ = [int(np.sum(cv_results[model]['iter'] == i)) for i in range(len(resources[model]))]
+            model_cv.n_iterations_ = model_cv.n_possible_iterations_ = model_cv.n_required_iterations_ = len(resources[model])
+            model_cv.min_resources_, model_cv.max_resources_ = resources[model][0], resources[model][-1]
+        cv_searches[model] = model_cv
+
+    return cv_searches
@@ -35,7 +35,7 @@ def init_knn():
         'n_neighbors': np.arange(1, 101),
     }
 
-    return ['Grid', knn, knn_params]
+    return ['Neighbors', knn, knn_params]
 
 
 def init_naive_bayes(y):
@@ -59,9 +59,15 @@ def init_naive_bayes(y):
     return ['Grid', gnb, gnb_params]
 
 
-def init_logreg():
+def init_logreg(search='Grid'):
     """Initialize Logistic Regression model
 
+    Parameters
+    ----------
+    search : str, optional
+        CV search to perform: 'Grid' fits every C from scratch, while 'Path' fits each fold's
+        C values in increasing order, warm starting from the previous solution (default='Grid')
+
     Returns
     -------
     list
@@ -74,12 +80,18 @@ def init_logreg():
         'random_state': [42],
     }
 
-    return ['Grid', lr, lr_params]
+    return [search, lr, lr_params]
 
 
-def init_svm():
+def init_svm(search='Grid'):
     """Initialize Support Vector Machine model
 
+    Parameters
+    ----------
+    search : str, optional
+        CV search to perform: 'Grid' schedules every C as its own fit, while 'Path' fits each
+        fold's C values in increasing order within one task (default='Grid')
+
     Returns
     -------
     list
@@ -92,12 +104,18 @@ def init_svm():
         'random_state': [42],
     }
 
-    return ['Grid', svm, svm_params]
+    return [search, svm, svm_params]
 
 
-def init_rf():
+def init_rf(search='Random'):
     """Initialize Random Forest model
 
+    Parameters
+    ----------
+    search : str, optional
+        CV search to perform: 'Random' trains every sampled forest at full size, while 'Halving'
+        grows candidates' number of trees in rounds, dropping weak candidates early (default='Random')
+
     Returns
     -------
     list
@@ -112,7 +130,7 @@ def init_rf():
         'random_state': [42],
     }
 
-    return ['Random', rf, rf_params]
+    return [search, rf, rf_params]
 
 
 def get_cv_models(y):
@@ -0,0 +1,633 @@
+"""Bracket Simulation Helper Functions
+
+This script is used as a helper module in the data_pipeline script.
+
+The tournament field is encoded as integer team IDs: 64 first round slots, plus the play-in
+games whose winners fill the open slots. Every possible matchup is scored up front into a
+team-by-team matrix (win_matrix[i, j] = probability that team i beats team j), so brackets
+and whole batches of simulated tournaments need only NumPy array lookups.
+
+The following functions are present:
+    * create_bracket_field
+    * upset_probabilities
+    * orient_matchups
+    * field_matchups
+    * init_win_matrix
+    * set_upset_probs
+    * fill_win_matrix
+    * complete_win_matrix
+    * picks_to_bracket
+    * predict_bracket
+    * score_brackets
+    * encode_brackets
+    * decode_brackets
+    * decode_bracket
+    * simulate_tournament
+    * sample_brackets
+    * exact_advancement
+    * optimize_bracket
+    * advancement_table
+
+Requires a minimum of the 'pandas' and 'numpy' libraries, as well as the 'data_integrity',
+'feature_engineering', and 'team_registry' helper modules, being present in your environment to run.
+"""
+
+import pandas as pd
+import numpy as np
+from data_integrity import rounds_numeric_to_str
+from feature_engineering import favorite_mask, create_bracket_winners
+from team_registry import team_ids
+
+# Rounds a team can reach (the first round is reached by every team not in the play-in)
+advancement_rounds = [rounds_numeric_to_str[i] for i in range(1, 7)] + ['Champion']
+
+# Points for each correct pick by round (play-in through championship); ESPN-style doubling
+espn_round_points = [0, 10, 20, 40, 80, 160, 320]
+
+
+def create_bracket_field(play_in, first_round, season_df):
+    """Encode the tournament field as integer team IDs
+
+    Parameters
+    ----------
+    play_in : DataFrame
+        Scraped matchups from the play-in round
+    first_round : DataFrame
+        Scraped matchups from the first round; slots awaiting play-in winners are null
+    season_df : DataFrame
+        Cleaned regular season team stats, indexed by team ID (for breaking ties between equal seeds)
+
+    Returns
+    -------
+    field : dict
+        Team names, seeds, and win percentages (indexed by team ID), the team ID in each
+        first round slot (-1 if awaiting a play-in winner), and the play-in matchups
+    """
+    # Order teams as they appear in the bracket: play-in teams, then first round teams
+    play_in_teams = play_in[['Seed', 'Team', 'Seed.1', 'Team.1']].to_numpy().reshape(-1, 2)
+    first_round_teams = first_round[['Seed', 'Team', 'Seed.1', 'Team.1']].to_numpy().reshape(-1, 2)
+    slot_filled = pd.notnull(first_round_teams[:, 1])
+
+    teams = pd.DataFrame(np.concatenate([play_in_teams, first_round_teams[slot_filled]]), columns=['Seed', 'Team'])
+    teams = teams.drop_duplicates(subset='Team', ignore_index=True)
+    field_ids = pd.Series(teams.index, index=teams['Team'])
+
+    # Regular season win percentage of each team (used when seeds are equivalent)
+    win_pcts = season_df['W-L%'].astype(float)
+    win_pcts = win_pcts[~win_pcts.index.duplicated()]
+
+    slots = np.full(len(first_round_teams), -1)
+    slots[slot_filled] = field_ids[first_round_teams[slot_filled, 1]].to_numpy()
+
+    field = {
+        'teams': teams['Team'].to_numpy(),
+        'seeds': teams['Seed'].to_numpy(dtype=int),
+        'win_pcts': win_pcts.reindex(team_ids(teams['Team'])).to_numpy(),
+        'slots': slots,
+        'play_in': field_ids[play_in_teams[:, 1]].to_numpy().reshape(-1, 2),
+    }
+
+    return field
+
+
+def upset_probabilities(model, X):
+    """Predict the probability of an upset for each matchup
+
+    Parameters
+    ----------
+    model : sklearn.base.BaseEstimator
+        Model of choice for tournament matchup predictions
+    X : DataFrame
+        Tournament matchups used for model prediction
+
+    Returns
+    -------
+    ndarray
+        Probability that the underdog wins each matchup
+    """
+    if hasattr(model, 'predict_proba'):
+        return model.predict_proba(X)[:, 1]
+
+    # Models without probabilities (i.e. LinearSVC) have their decision function squashed instead
+    return 1 / (1 + np.exp(-model.decision_function(X)))
+
+
+def orient_matchups(field, team_a, team_b):
+    """Identify the favorite & underdog of each matchup
+
+    Parameters
+    ----------
+    field : dict
+        Tournament field created by create_bracket_field()
+    team_a, team_b : ndarray
+        Team IDs of each matchup
+
+    Returns
+    -------
+    faves, underdogs : ndarray
+        Team IDs of each matchup's favorite & underdog
+    """
+    # Same rule as the tournament data (team_b is the favorite when seed & record are both equivalent)
+    seeds, win_pcts = field['seeds'], field['win_pcts']
+    a_is_fave = favorite_mask(seeds[team_a], seeds[team_b], win_pcts[team_a], win_pcts[team_b])
+
+    return np.where(a_is_fave, team_a, team_b), np.where(a_is_fave, team_b, team_a)
+
+
+def field_matchups(field):
+    """Get every possible matchup in the field
+
+    Parameters
+    ----------
+    field : dict
+        Tournament field created by create_bracket_field()
+
+    Returns
+    -------
+    faves, underdogs : ndarray
+        Team IDs of each matchup's favorite & underdog
+    """
+    return orient_matchups(field, *np.triu_indices(len(field['teams']), k=1))
+
+
+def init_win_matrix(field):
+    """Create an empty (all unknown) win probability matrix for a field
+
+    Parameters
+    ----------
+    field : dict
+        Tournament field created by create_bracket_field()
+
+    Returns
+    -------
+    ndarray
+        Square matrix of NaNs, one row & column per team
+    """
+    n_teams = len(field['teams'])
+    return np.full((n_teams, n_teams), np.nan)
+
+
+def set_upset_probs(win_matrix, faves, underdogs, upset_probs):
+    """Store the predicted upset probabilities of matchups in a win probability matrix
+
+    Parameters
+    ----------
+    win_matrix : ndarray
+        Win probability matrix; updated in place
+    faves, underdogs : ndarray
+        Team IDs of each matchup's favorite & underdog
+    upset_probs : ndarray
+        Probability that the underdog wins each matchup
+    """
+    win_matrix[faves, underdogs] = 1 - upset_probs
+    win_matrix[underdogs, faves] = upset_probs
+
+
+def fill_win_matrix(field, win_matrix, team_a, team_b, score_matchups):
+    """Score any matchups whose win probabilities are still unknown
+
+    Parameters
+    ----------
+    field : dict
+        Tournament field created by create_bracket_field()
+    win_matrix : ndarray
+        Win probability matrix; updated in place
+    team_a, team_b : ndarray
+        Team IDs of matchups that are about to be played
+    score_matchups : callable
+        Takes favorites' and underdogs' team IDs, returns the probability of each upset
+    """
+    # Find the distinct matchups that haven't been scored yet (each pair encoded as a single int)
+    unknown = np.isnan(win_matrix[team_a, team_b])
+    if not unknown.any():
+        return
+    n_teams = len(win_matrix)
+    pairs = np.unique(team_a[unknown] * n_teams + team_b[unknown])
+    faves, underdogs = orient_matchups(field, pairs // n_teams, pairs % n_teams)
+
+    set_upset_probs(win_matrix, faves, underdogs, score_matchups(faves, underdogs))
+
+
+def complete_win_matrix(field, score_matchups):
+    """Score every possible matchup in the field at once
+
+    Parameters
+    ----------
+    field : dict
+        Tournament field created by create_bracket_field()
+    score_matchups : callable
+        Takes favorites' and underdogs' team IDs, returns the probability of each upset
+
+    Returns
+    -------
+    win_matrix : ndarray
+        Win probability of every team (rows) against every other team (columns)
+    """
+    win_matrix = init_win_matrix(field)
+    fill_win_matrix(field, win_matrix, *field_matchups(field), score_matchups)
+
+    return win_matrix
+
+
+def picks_to_bracket(field, picks):
+    """Format the picked winners of every game as a bracket
+
+    Parameters
+    ----------
+    field : dict
+        Tournament field created by create_bracket_field()
+    picks : list
+        Team IDs of the picked winners of each round (play-in through championship)
+
+    Returns
+    -------
+    bracket_preds : DataFrame
+        Completely generated, properly formatted bracket
+    """
+    teams, seeds = field['teams'], field['seeds']
+    all_curr_rounds = []
+
+    # Play-in winners fill the open first round slots; consecutive slots then meet each round
+    slots = field['slots'].copy()
+    slots[slots == -1] = picks[0]
+    all_matchups = [field['play_in']]
+    for winners in picks[1:]:
+        all_matchups.append(slots.reshape(-1, 2))
+        slots = winners
+
+    for curr_round, (matchups, winners) in enumerate(zip(all_matchups, picks)):
+        faves, underdogs = orient_matchups(field, matchups[:, 0], matchups[:, 1])
+        all_curr_rounds.append(pd.DataFrame({
+            'Seed_Favorite': seeds[faves],
+            'Team_Favorite': teams[faves],
+            'Seed_Underdog': seeds[underdogs],
+            'Team_Underdog': teams[underdogs],
+            'Round': rounds_numeric_to_str[curr_round],
+            'Underdog_Upset': (winners == underdogs).astype(int),
+        }))
+
+    bracket_preds = pd.concat(all_curr_rounds, ignore_index=True)
+    create_bracket_winners(bracket_preds)
+
+    return bracket_preds
+
+
+def predict_bracket(field, win_matrix, threshold=0.5):
+    """Generate a single bracket by picking every upset above a probability threshold
+
+    Parameters
+    ----------
+    field : dict
+        Tournament field created by create_bracket_field()
+    win_matrix : ndarray
+        Complete win probability matrix
+    threshold : float, optional
+        Upset probability above which the underdog is picked (default=0.5)
+
+    Returns
+    -------
+    bracket_preds : DataFrame
+        Completely generated, properly formatted bracket
+    """
+    picks = []
+
+    def pick_winners(team_a, team_b):
+        faves, underdogs = orient_matchups(field, team_a, team_b)
+        picks.append(np.where(win_matrix[underdogs, faves] > threshold, underdogs, faves))
+        return picks[-1]
+
+    # Play-in winners fill the open first round slots; consecutive slots then meet each round
+    slots = field['slots'].copy()
+    slots[slots == -1] = pick_winners(field['play_in'][:, 0], field['play_in'][:, 1])
+    for curr_round in range(1, 7):
+        slots = pick_winners(slots[0::2], slots[1::2])
+
+    return picks_to_bracket(field, picks)
+
+
+def score_brackets(field, faves, underdogs, X, model, threshs):
+    """Score matchups with a model, then generate a bracket at each decision threshold
+
+    Parameters
+    ----------
+    field : dict
+        Tournament field created by create_bracket_field()
+    faves, underdogs : ndarray
+        Team IDs of each matchup's favorite & underdog; must cover every possible matchup
+    X : DataFrame
+        Features of each matchup used for model prediction
+    model : sklearn.base.BaseEstimator
+        Model of choice for tournament matchup predictions
+    threshs : list
+        Upset probabilities above which the underdog is picked; one bracket per threshold
+
+    Returns
+    -------
+    list
+        Generated bracket at each threshold
+    """
+    win_matrix = init_win_matrix(field)
+    set_upset_probs(win_matrix, faves, underdogs, upset_probabilities(model, X))
+
+    return [predict_bracket(field, win_matrix, thresh) for thresh in threshs]
+
+
+def encode_brackets(field, picks):
+    """Pack brackets into compact fixed-width codes
+
+    Every game outcome is stored as a single bit (1 if the second team of the matchup, in
+    bracket order, wins), so a full bracket (4 play-in + 63 games) fits in 9 bytes.
+
+    Parameters
+    ----------
+    field : dict
+        Tournament field created by create_bracket_field()
+    picks : list
+        Team IDs of the picked winners of each round (play-in through championship); each
+        round is an array of shape (n_games,) for a single bracket or (n_brackets, n_games)
+
+    Returns
+    -------
+    ndarray
+        uint8 codes of shape (n_brackets, n_bytes)
+    """
+    picks = [np.atleast_2d(winners) for winners in picks]
+
+    slots = np.tile(field['slots'], (len(picks[0]), 1))
+    slots[:, slots[0] == -1] = picks[0]
+    outcomes = [picks[0] == field['play_in'][:, 1]]
+    for winners in picks[1:]:
+        outcomes.append(winners == slots[:, 1::2])
+        slots = winners
+
+    return np.packbits(np.concatenate(outcomes, axis=1), axis=1)
+
+
+def decode_brackets(field, codes):
+    """Unpack compact bracket codes back into each round's winners
+
+    Parameters
+    ----------
+    field : dict
+        Tournament field created by create_bracket_field()
+    codes : ndarray
+        uint8 codes created by encode_brackets()
+
+    Returns
+    -------
+    picks : list
+        uint8 team IDs of each round's winners (play-in through championship), each of shape (n_brackets, n_games)
+    """
+    codes = np.atleast_2d(codes)
+    n_play_in = len(field['play_in'])
+    outcomes = np.unpackbits(codes, axis=1, count=n_play_in + len(field['slots']) - 1).astype(bool)
+
+    slots = np.tile(field['slots'], (len(codes), 1))
+    picks = [np.where(outcomes[:, :n_play_in], field['play_in'][:, 1], field['play_in'][:, 0])]
+    slots[:, slots[0] == -1] = picks[0]
+
+    # Each round's outcomes follow the previous round's, in bracket order
+    start = n_play_in
+    while slots.shape[1] > 1:
+        n_games = slots.shape[1] // 2
+        slots = np.where(outcomes[:, start:start + n_games], slots[:, 1::2], slots[:, 0::2])
+        picks.append(slots)
+        start += n_games
+
+    return [winners.astype(np.uint8) for winners in picks]
+
+
+def decode_bracket(field, code):
+    """Format a single compact bracket code as a bracket
+
+    Parameters
+    ----------
+    field : dict
+        Tournament field created by create_bracket_field()
+    code : ndarray
+        uint8 code of one bracket created by encode_brackets()
+
+    Returns
+    -------
+    bracket_preds : DataFrame
+        Completely generated, properly formatted bracket
+    """
+    picks = [winners[0] for winners in decode_brackets(field, code)]
+    return picks_to_bracket(field, picks)
+
+
+def _simulate_batches(field, win_matrix, n_sims, random_state, batch_size):
+    # Yields each round's winners (play-in through championship) for one batch of tournaments at a time
+    rng = np.random.default_rng(random_state)
+    open_slots = np.flatnonzero(field['slots'] == -1)
+
+    def play_games(team_a, team_b):
+        # Team 'a' wins whenever the random draw falls under its win probability
+        a_wins = rng.random(team_a.shape) < win_matrix[team_a, team_b]
+        return np.where(a_wins, team_a, team_b)
+
+    for start in range(0, n_sims, batch_size):
+        n = min(batch_size, n_sims - start)
+
+        # Play-in winners fill the open first round slots
+        slots = np.tile(field['slots'], (n, 1))
+        play_in = np.broadcast_to(field['play_in'], (n,) + field['play_in'].shape)
+        picks = [play_games(play_in[..., 0], play_in[..., 1])]
+        slots[:, open_slots] = picks[0]
+
+        # Pair up consecutive slots each round; winners advance to the next round
+        for curr_round in range(1, len(advancement_rounds)):
+            matchups = slots.reshape(n, -1, 2)
+            slots = play_games(matchups[..., 0], matchups[..., 1])
+            picks.append(slots)
+
+        yield picks
+
+
+def simulate_tournament(field, win_matrix, n_sims=1000000, random_state=42, batch_size=100000):
+    """Simulate full tournaments (play-in through championship) in vectorized batches
+
+    Parameters
+    ----------
+    field : dict
+        Tournament field created by create_bracket_field()
+    win_matrix : ndarray
+        Complete win probability matrix
+    n_sims : int, optional
+        Number of tournaments to simulate (default=1000000)
+    random_state : int, optional
+        Seed for reproducible sampling (default=42)
+    batch_size : int, optional
+        Number of tournaments simulated at once; bounds memory usage (default=100000)
+
+    Returns
+    -------
+    reach_probs : ndarray
+        Probability of each team (columns) reaching each round in 'advancement_rounds' (rows)
+    """
+    n_teams = len(field['teams'])
+    reach_counts = np.zeros((len(advancement_rounds), n_teams))
+    filled_slots = field['slots'][field['slots'] != -1]
+
+    for picks in _simulate_batches(field, win_matrix, n_sims, random_state, batch_size):
+        # Teams outside the play-in reach the first round in every simulation
+        reach_counts[0] += len(picks[0]) * np.bincount(filled_slots, minlength=n_teams)
+        for curr_round, winners in enumerate(picks):
+            reach_counts[curr_round] += np.bincount(winners.ravel(), minlength=n_teams)
+
+    reach_probs = reach_counts / n_sims
+
+    return reach_probs
+
+
+def sample_brackets(field, win_matrix, n_sims=1000000, random_state=42, batch_size=100000):
+    """Simulate full tournaments and keep every outcome as a compact bracket code
+
+    Parameters
+    ----------
+    field : dict
+        Tournament field created by create_bracket_field()
+    win_matrix : ndarray
+        Complete win probability matrix
+    n_sims : int, optional
+        Number of tournaments to simulate (default=1000000)
+    random_state : int, optional
+        Seed for reproducible sampling (default=42)
+    batch_size : int, optional
+        Number of tournaments simulated at once; bounds memory usage (default=100000)
+
+    Returns
+    -------
+    ndarray
+        uint8 codes of every simulated tournament, shape (n_sims, n_bytes)
+    """
+    return np.concatenate([encode_brackets(field, picks) for picks 
+                           in _simulate_batches(field, win_matrix, n_sims, random_state, batch_size)])
+
+
+def exact_advancement(field, win_matrix):
+    """Compute exact round advancement probabilities by walking up the bracket tree
+
+    Parameters
+    ----------
+    field : dict
+        Tournament field created by create_bracket_field()
+    win_matrix : ndarray
+        Complete win probability matrix
+
+    Returns
+    -------
+    reach_probs : ndarray
+        Probability of each team (columns) reaching each round in 'advancement_rounds' (rows)
+    """
+    n_teams = len(field['teams'])
+    win_matrix = np.nan_to_num(win_matrix)
+    reach_probs = np.zeros((len(advancement_rounds), n_teams))
+
+    # Distribution of which team occupies each first round slot; play-in winners fill the open slots
+    slot_probs = np.zeros((len(field['slots']), n_teams))
+    filled = field['slots'] != -1
+    slot_probs[filled, field['slots'][filled]] = 1
+    team_a, team_b = field['play_in'][:, 0], field['play_in'][:, 1]
+    open_slots = np.flatnonzero(~filled)
+    slot_probs[open_slots, team_a] = win_matrix[team_a, team_b]
+    slot_probs[open_slots, team_b] = win_matrix[team_b, team_a]
+    reach_probs[0] = slot_probs.sum(axis=0)
+
+    # A team wins its game if it comes out of its own subtree & beats whoever comes out of the other
+    for curr_round in range(1, len(advancement_rounds)):
+        left, right = slot_probs[0::2], slot_probs[1::2]
+        slot_probs = left * (right @ win_matrix.T) + right * (left @ win_matrix.T)
+        reach_probs[curr_round] = slot_probs.sum(axis=0)
+
+    return reach_probs
+
+
+def optimize_bracket(field, reach_probs, round_points=None, top_k=5):
+    """Find the brackets with the most expected points under a pool's scoring rules
+
+    Parameters
+    ----------
+    field : dict
+        Tournament field created by create_bracket_field()
+    reach_probs : ndarray
+        Probability of each team (columns) reaching each round in 'advancement_rounds' (rows)
+    round_points : list, optional
+        Points for each correct pick by round, play-in through championship
+        (default=None, 'espn_round_points')
+    top_k : int, optional
+        Number of brackets to return; the best bracket for each of the top_k champions (default=5)
+
+    Returns
+    -------
+    list
+        (expected points, picks) of each bracket, best first; picks are the team IDs of
+        each round's picked winners (play-in through championship)
+    """
+    if round_points is None:
+        round_points = espn_round_points
+    n_teams = len(field['teams'])
+
+    # Picking a team to win a game earns its points whenever that team gets one round further
+    pick_points = np.asarray(round_points, dtype=float)[:, None] * reach_probs
+
+    # Most expected points within each slot's subtree, given the team picked to come out of it
+    # (-inf for teams outside the subtree); open slots come out of the play-in games
+    filled = field['slots'] != -1
+    open_slots = np.flatnonzero(~filled)
+    subtree_points = np.full((len(field['slots']), n_teams), -np.inf)
+    subtree_points[filled, field['slots'][filled]] = 0
+    for play_in_teams in field['play_in'].T:
+        subtree_points[open_slots, play_in_teams] = pick_points[0, play_in_teams]
+    all_subtree_points = [subtree_points]
+
+    # Each game's winner keeps its own subtree's best picks & takes the other subtree's best bracket
+    for curr_round in range(1, 7):
+        left, right = subtree_points[0::2], subtree_points[1::2]
+        subtree_points = np.maximum(left + right.max(axis=1, keepdims=True), 
+                                    right + left.max(axis=1, keepdims=True)) + pick_points[curr_round]
+        all_subtree_points.append(subtree_points)
+
+    # Trace each champion's best bracket back down the tree
+    champ_points = all_subtree_points[-1][0]
+    champions = [champ for champ in np.argsort(-champ_points, kind='stable')[:top_k] if np.isfinite(champ_points[champ])]
+    brackets = []
+
+    for champion in champions:
+        picks = [np.array([champion])]
+        for subtree_points in all_subtree_points[-2::-1]:
+            left, right = subtree_points[0::2], subtree_points[1::2]
+            winners = picks[0]
+            in_left = np.isfinite(left[np.arange(len(winners)), winners])
+
+            slot_winners = np.empty(2 * len(winners), dtype=int)
+            slot_winners[0::2] = np.where(in_left, winners, left.argmax(axis=1))
+            slot_winners[1::2] = np.where(in_left, right.argmax(axis=1), winners)
+            picks.insert(0, slot_winners)
+
+        # Only the open first round slots hold picks (play-in winners)
+        picks[0] = picks[0][open_slots]
+        brackets.append((champ_points[champion], picks))
+
+    return brackets
+
+
+def advancement_table(field, reach_probs):
+    """Format round advancement probabilities for each team
+
+    Parameters
+    ----------
+    field : dict
+        Tournament field created by create_bracket_field()
+    reach_probs : ndarray
+        Probability of each team (columns) reaching each round in 'advancement_rounds' (rows)
+
+    Returns
+    -------
+    advancement_df : DataFrame
+        Each team's seed and probability of reaching each round, sorted by title chances
+    """
+    advancement_df = pd.DataFrame(reach_probs.T, index=pd.Index(field['teams'], name='Team'), columns=advancement_rounds)
+    advancement_df.insert(0, 'Seed', field['seeds'])
+
+    return advancement_df.sort_values(advancement_rounds[::-1], ascending=False)
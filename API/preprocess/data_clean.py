@@ -13,13 +13,14 @@ The following functions are present:
     * fill_playin_teams
     * clean_bracket
 
-Requires a minimum of the 'pandas' and 'datetime' libraries, as well as the 'data_integrity' 
+Requires a minimum of the 'pandas', 'numpy', and 'datetime' libraries, as well as the 'team_registry' 
 and 'feature_engineering' helper modules, being present in your environment to run.
 """
 
 import pandas as pd
+import numpy as np
 from datetime import datetime
-from data_integrity import coach_to_season_dict, hist_season_to_tourney_dict, curr_season_to_tourney_dict
+from team_registry import team_ids, team_index
 from feature_engineering import totals_to_game_average, create_faves_underdogs, bidirectional_rounds_str_numeric, create_target_variable
 
 current_year = datetime.now().year
@@ -51,6 +52,9 @@ def clean_basic_stats(df):
     # Filter out teams that didn't participate in March Madness tournament
     ncaa_df = df[df['School'].str.contains('NCAA')]
 
+    # Identify teams by ID to ensure successful merging with other team data
+    ncaa_df = ncaa_df.set_index(team_index(ncaa_df['School']))
+
     return ncaa_df
 
 
@@ -64,11 +68,14 @@ def clean_adv_stats(df):
 
     Returns
     -------
-    DataFrame
+    adv_df : DataFrame
         All advanced regular reason data for March Madness teams
     """
     # Filter out redundant features already captured from basic stats web scraping
-    return pd.concat([df['School'], df.iloc[:, -13:]], axis=1)
+    adv_df = pd.concat([df['School'], df.iloc[:, -13:]], axis=1)
+
+    # Identify teams by ID to ensure successful merging with basic stats
+    return adv_df.set_index(team_index(adv_df['School']))
 
 
 def clean_coach_stats(coach_df):
@@ -84,8 +91,8 @@ def clean_coach_stats(coach_df):
     coach_df : DataFrame
         Cleaned coach data for March Madness teams
     """
-    # Change team names accordingly to ensure successful merging with team stats
-    coach_df['Coach_Team'].replace(coach_to_season_dict, inplace=True)
+    # Identify teams by ID to ensure successful merging with team stats
+    coach_df.index = team_index(coach_df['Coach_Team'])
 
     # Fill null values with '0' placeholder
     coach_df.iloc[:, 1:] = coach_df.iloc[:, 1:].replace('', '0')
@@ -93,13 +100,11 @@ def clean_coach_stats(coach_df):
     return coach_df
 
 
-def clean_merged_season_stats(year, all_season_df, season_basic_df):
+def clean_merged_season_stats(all_season_df, season_basic_df):
     """Clean fully merged dataset
 
     Parameters
     ----------
-    year : int
-        Calendar year
     all_season_df : DataFrame
         Complete regular season dataset (uncleaned)
     season_basic_df : DataFrame
@@ -110,12 +115,6 @@ def clean_merged_season_stats(year, all_season_df, season_basic_df):
     all_season_df : DataFrame
         Cleaned regular season dataset, ready for merging with tournament matchup data
     """
-    # Change team names accordingly to ensure successful merging with tournament matchups
-    all_season_df['School'].replace(
-        hist_season_to_tourney_dict if (year != current_year) else curr_season_to_tourney_dict, 
-        inplace=True
-    )
-
     # Convert team regular season stats from season totals to per game averages
     totals_to_game_average(all_season_df, season_basic_df)
 
@@ -144,17 +143,18 @@ def clean_tourney_data(year, mm_df, season_df):
         for col in ['Round', 'Team', 'Team.1']:
             mm_df[col] = mm_df[col].apply(lambda name: name[:-(len(name) // 2)].strip())
 
+    # Identify teams by ID to ensure successful merging with regular season stats
+    mm_df['Team_ID'] = team_ids(mm_df['Team'])
+    mm_df['Team_ID.1'] = team_ids(mm_df['Team.1'])
+
     # Transform team listings into favorite-underdog matchups (using seeds & regular season record)
     faves_unds = create_faves_underdogs(mm_df, season_df)
 
     # Create new features representing favorite-underdog matchups
-    mm_df_struct = ['Seed', 'Team', 'Score']
-    for key in faves_unds.keys():    
-        for j in range(len(mm_df_struct)):
-            try:
-                mm_df[mm_df_struct[j] + "_" + key] = faves_unds[key][:, j]
-            except IndexError:
-                continue
+    for key, teams_df in faves_unds.items():
+        for col in teams_df.columns:
+            mm_df[col + "_" + key] = teams_df[col].to_numpy()
+
     # Create target variable (for training dataset only, otherwise KeyError is thrown)
     try:
         mm_df['Underdog_Upset'] = create_target_variable(mm_df)
@@ -162,7 +162,7 @@ def clean_tourney_data(year, mm_df, season_df):
         pass
             
     # Drop old matchup data features
-    mm_df_drop = ['Seed', 'Team', 'Seed.1', 'Team.1']
+    mm_df_drop = ['Seed', 'Team', 'Team_ID', 'Seed.1', 'Team.1', 'Team_ID.1']
     mm_df.drop(mm_df_drop, axis=1, inplace=True)
 
     return mm_df
@@ -232,16 +232,15 @@ def fill_playin_teams(all_curr_matchups):
     # Get first round matchups data
     first_round = all_curr_matchups[1]
     # Get indexes from rows where the play-in nulls are present
-    playin_nulls = list(first_round[first_round.isnull().any(axis=1)].index)
+    playin_nulls = first_round.index[first_round.isnull().any(axis=1)]
 
-    for i, data in all_curr_matchups[0].iterrows():
-        # Get winner seed & name from play-in DataFrame
-        winner_seed = data['Seed'] if (data['Underdog_Upset'] == 0) else data['Seed.1']
-        winner_team = data['Team'] if (data['Underdog_Upset'] == 0) else data['Team.1']
+    # Get winner seeds & names from play-in DataFrame
+    play_in = all_curr_matchups[0]
+    upsets = (play_in['Underdog_Upset'] == 1).to_numpy()
 
-        # Place play-in winner in appropriate first round matchup (based on playin_nulls index)
-        first_round.loc[playin_nulls[i], 'Seed.1'] = winner_seed
-        first_round.loc[playin_nulls[i], 'Team.1'] = winner_team
+    # Place play-in winners in appropriate first round matchups (based on playin_nulls index)
+    first_round.loc[playin_nulls, 'Seed.1'] = np.where(upsets, play_in['Seed.1'], play_in['Seed'])
+    first_round.loc[playin_nulls, 'Team.1'] = np.where(upsets, play_in['Team.1'], play_in['Team'])
 
 
 def clean_bracket(all_curr_matchups, all_curr_rounds):
@@ -7,10 +7,11 @@ The following functions are present:
     * merge_clean_coaches
     * merge_clean_tourney_games
 
-Requires a minimum of the 'pandas' library being present in your environment to run.
+Requires a minimum of the 'pandas' and 'numpy' libraries being present in your environment to run.
 """
 
 import pandas as pd
+import numpy as np
 
 
 def merge_clean_team_stats(basic_df, adv_df):
@@ -28,8 +29,8 @@ def merge_clean_team_stats(basic_df, adv_df):
     season_team_stats_df : DataFrame
         All teams' regular season stats
     """
-    # Merge on the school name
-    season_team_stats_df = pd.merge(basic_df, adv_df, on='School')
+    # Merge on the team ID
+    season_team_stats_df = pd.merge(basic_df, adv_df.drop('School', axis=1), left_index=True, right_index=True)
 
     # Strip the 'NCAA' tag from the teams with a tournament berth
     if season_team_stats_df['School'].str.contains('NCAA').any():
@@ -53,9 +54,9 @@ def merge_clean_rankings(team_stats_df, rankings_df):
     season_stats_rankings_df : DataFrame
         Newly-merged DataFrame of a teams' regular season stats with their regular season ranking
     """
-    # Merge on the school name
-    season_stats_rankings_df = pd.merge(team_stats_df, rankings_df, 
-                                        left_on='School', right_on='Team').drop('Team', axis=1)
+    # Merge on the team ID
+    season_stats_rankings_df = pd.merge(team_stats_df, rankings_df.drop('Team', axis=1), 
+                                        left_index=True, right_index=True)
     
     return season_stats_rankings_df
 
@@ -75,9 +76,9 @@ def merge_clean_coaches(stats_rankings_df, coaches_df):
     all_season_stats_df : DataFrame
         Newly-merged DataFrame of a teams' regular season stats, regular season ranking, and coach performance
     """
-    # Merge on the school name
-    all_season_stats_df = pd.merge(stats_rankings_df, coaches_df,
-                                    left_on='School', right_on='Coach_Team').drop('Coach_Team', axis=1)
+    # Merge on the team ID
+    all_season_stats_df = pd.merge(stats_rankings_df, coaches_df.drop('Coach_Team', axis=1),
+                                    left_index=True, right_index=True)
 
     return all_season_stats_df
 
@@ -90,20 +91,35 @@ def merge_clean_tourney_games(mm_df, all_season_df):
     mm_df : DataFrame
         All teams' tournament matchups
     all_season_df : DataFrame
-        All teams' data
+        All teams' data (indexed by team ID)
 
     Returns
     -------
     all_data_df : DataFrame
         Completed dataset
     """
-    # Merge favorites' season data onto tournament matchups DataFrame
-    favorites_data_df = pd.merge(mm_df, all_season_df, 
-                                left_on='Team_Favorite', right_on='School').drop('School', axis=1)
-    
-    # Merge underdogs' season data onto tournament matchups DataFrame
-    # Account for duplicate stats column names with suffix labeling
-    all_data_df = pd.merge(favorites_data_df, all_season_df, suffixes=("_Favorite", "_Underdog"),
-                            left_on='Team_Underdog', right_on='School').drop('School', axis=1)
-
-    return all_data_df
\ No newline at end of file
+    # One row of season stats per team
+    season_stats_df = all_season_df.drop('School', axis=1)
+    season_stats_df = season_stats_df[~season_stats_df.index.duplicated()]
+
+    # Locate favorites' & underdogs' rows by team ID
+    fave_rows = season_stats_df.index.get_indexer(mm_df['Team_ID_Favorite'])
+    underdog_rows = season_stats_df.index.get_indexer(mm_df['Team_ID_Underdog'])
+
+    # Group matchups by favorite, then by underdog (in order of appearance), dropping matchups missing
+    # either team's data in between, to match the row order of the previous merge-based implementation
+    # so rebuilt years agree with stored datasets
+    rows = np.flatnonzero(fave_rows != -1)
+    rows = rows[np.argsort(pd.factorize(fave_rows[rows])[0], kind='stable')]
+    rows = rows[underdog_rows[rows] != -1]
+    rows = rows[np.argsort(pd.factorize(underdog_rows[rows])[0], kind='stable')]
+
+    # Gather each side's season data onto tournament matchups DataFrame, keeping each stat's dtype
+    # (team IDs are only used for gathering)
+    all_data_df = pd.concat([
+        mm_df.iloc[rows].drop(['Team_ID_Favorite', 'Team_ID_Underdog'], axis=1).reset_index(drop=True),
+        season_stats_df.iloc[fave_rows[rows]].add_suffix("_Favorite").reset_index(drop=True),
+        season_stats_df.iloc[underdog_rows[rows]].add_suffix("_Underdog").reset_index(drop=True),
+    ], axis=1)
+
+    return all_data_df
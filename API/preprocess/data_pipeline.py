@@ -3,28 +3,98 @@
 This script is used as a module in the March_Madness_Predictions Jupyter notebooks.
 
 The following functions are present:
+    * season_page_urls
+    * prefetch_season_pages
     * regular_season_stats
     * team_rankings
     * coach_performance
     * all_team_season_data
+    * season_features
+    * invalidate_season_features
     * hist_tournament_games
     * dataset_pipeline
     * feature_pipeline
     * round_pipeline
     * bracket_pipeline
-
-Requires a minimum of the 'pandas' library, as well as the 'data_fetch', 'data_clean',
-'data_merge', and 'feature_engineering' helper modules, being present in your environment to run.
+    * field_matchup_features
+    * field_matchup_scorer
+    * matchup_matrix_pipeline
+    * simulation_pipeline
+    * advancement_pipeline
+    * optimal_bracket_pipeline
+    * live_tournament_pipeline
+    * multi_bracket_pipeline
+
+Requires a minimum of the 'pandas' and 'concurrent' libraries, as well as the 'data_fetch', 'page_prefetch', 'data_store',
+'data_clean', 'data_merge', 'feature_engineering', 'team_registry', 'bracket_simulation', and 'live_tournament' helper modules, being present in your environment to run.
 """
 
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 from data_clean import clean_basic_stats, clean_adv_stats, clean_coach_stats, clean_merged_season_stats, clean_tourney_data, clean_curr_round_data, fill_playin_teams, clean_bracket
 from data_merge import merge_clean_team_stats, merge_clean_rankings, merge_clean_coaches, merge_clean_tourney_games
-from feature_engineering import team_points_differentials, bidirectional_rounds_str_numeric, matchups_to_underdog_relative, scale_features, create_bracket_round, create_bracket_winners
+from feature_engineering import engineer_matchup_features, get_preprocessor, create_bracket_round, create_bracket_winners
+from team_registry import team_ids, team_index
+from live_tournament import init_live_tournament
+from bracket_simulation import create_bracket_field, upset_probabilities, field_matchups, complete_win_matrix, picks_to_bracket, score_brackets, simulate_tournament, exact_advancement, optimize_bracket, advancement_table
 
 from sys import path
 path.append('../fetch')
 from data_fetch import get_team_data, get_rankings_data, get_coach_data
+from page_prefetch import prefetch_pages
+from data_store import stored_years, write_year_partition, read_partitions, write_season_features, stored_season_years, read_season_features, invalidate_years
+
+# Web pages fetched for every season
+season_urls = {
+    'basic': "https://www.sports-reference.com/cbb/seasons/{year}-school-stats.html",
+    'advanced': "https://www.sports-reference.com/cbb/seasons/{year}-advanced-school-stats.html",
+    'ratings': "https://www.sports-reference.com/cbb/seasons/{year}-ratings.html",
+    'coaches': "https://www.sports-reference.com/cbb/seasons/{year}-coaches.html",
+    'tourney': ("https://apps.washingtonpost.com/sports/search/?pri_school_id=&pri_conference=&pri_coach"
+                "=&pri_seed_from=1&pri_seed_to=16&pri_power_conference=&pri_bid_type=&opp_school_id"
+                "=&opp_conference=&opp_coach=&opp_seed_from=1&opp_seed_to=16&opp_power_conference"
+                "=&opp_bid_type=&game_type=7&from={year}&to={year}&submit="),
+}
+
+# Cleaned season stats already built this session, keyed by (store directory, year)
+season_feature_cache = {}
+# Directory where cleaned season stats are also stored across sessions (None = memory only)
+season_store_dir = None
+
+
+def season_page_urls(year):
+    """Build the URLs of all web pages fetched for a season
+
+    Parameters
+    ----------
+    year : int
+        Calendar year
+
+    Returns
+    -------
+    dict
+        URL of each season web page, keyed by page type
+    """
+    return {page: url.format(year=year) for page, url in season_urls.items()}
+
+
+def prefetch_season_pages(years, max_workers=8):
+    """Concurrently download every season web page into the page cache
+
+    Parameters
+    ----------
+    years : list
+        Range of years whose web pages should be downloaded
+    max_workers : int, optional
+        Number of pages fetched at the same time (default=8)
+
+    Returns
+    -------
+    dict
+        Errors raised while fetching, keyed by URL
+    """
+    urls = [url for year in years for url in season_page_urls(year).values()]
+    return prefetch_pages(urls, max_workers)
 
 
 def regular_season_stats(year):
@@ -43,13 +113,11 @@ def regular_season_stats(year):
         All cleaned regular season stats for all teams in given year
     """
     # Fetch & clean basic regular season stats
-    season_basic_df = get_team_data(url=f"https://www.sports-reference.com/cbb/seasons/{year}-school-stats.html",
-                                    attrs={'id': 'basic_school_stats'})
+    season_basic_df = get_team_data(url=season_urls['basic'].format(year=year), attrs={'id': 'basic_school_stats'})
     clean_season_basic_df = clean_basic_stats(season_basic_df)
     
     # Fetch & clean advanced regular season stats
-    season_adv_df = get_team_data(url=f"https://www.sports-reference.com/cbb/seasons/{year}-advanced-school-stats.html", 
-                                attrs={'id': 'adv_school_stats'})
+    season_adv_df = get_team_data(url=season_urls['advanced'].format(year=year), attrs={'id': 'adv_school_stats'})
     clean_season_adv_df = clean_adv_stats(season_adv_df)
 
     # Merge all cleaned regular season stats
@@ -73,8 +141,9 @@ def team_rankings(year, season_stats):
     season_team_df : DataFrame
         Cleaned regular season stats and rankings for all teams in given year
     """
-    # Fetch team rankings data (already cleaned)
-    rankings_df = get_rankings_data(url=f"https://www.sports-reference.com/cbb/seasons/{year}-ratings.html")
+    # Fetch team rankings data (already cleaned); identify teams by ID for merging
+    rankings_df = get_rankings_data(url=season_urls['ratings'].format(year=year))
+    rankings_df.index = team_index(rankings_df['Team'])
 
     # Merge rankings data to all team stats
     season_team_df = merge_clean_rankings(season_stats, rankings_df)
@@ -98,7 +167,7 @@ def coach_performance(year, stats_rankings):
         Complete data for all regular season team and coach stats
     """
     # Fetch & clean coach performance data
-    coaches_df = get_coach_data(url=f"https://www.sports-reference.com/cbb/seasons/{year}-coaches.html")
+    coaches_df = get_coach_data(url=season_urls['coaches'].format(year=year))
     clean_coaches_df = clean_coach_stats(coaches_df)
 
     # Merge coach data to all regular season data
@@ -134,67 +203,145 @@ def all_team_season_data(year):
     return all_season_stats_df, clean_season_basic_df
 
 
-def hist_tournament_games(year, all_stats, basic_stats):
+def season_features(year, store_dir=None):
+    """Get the cleaned regular season stats of a year, building them only if needed
+
+    Seasons are built once, then reused from memory (and from the store directory across
+    sessions) until invalidated with invalidate_season_features().
+
+    Parameters
+    ----------
+    year : int
+        Calendar year
+    store_dir : str, optional
+        Directory where season stats are stored (default=None, 'season_store_dir')
+
+    Returns
+    -------
+    clean_season_df : DataFrame
+        Complete, cleaned data for all regular season team and coach stats (shared; not to be modified)
+    """
+    store_dir = store_dir if (store_dir is not None) else season_store_dir
+    if (store_dir, year) in season_feature_cache:
+        return season_feature_cache[(store_dir, year)]
+
+    clean_season_df = read_season_features(store_dir, year) if (store_dir is not None) else None
+
+    if clean_season_df is None:
+        # Fetch, clean, and merge all regular season team and coach data
+        all_season_stats_df, clean_season_basic_df = all_team_season_data(year)
+        clean_season_df = clean_merged_season_stats(all_season_stats_df, clean_season_basic_df)
+
+        if store_dir is not None:
+            write_season_features(store_dir, year, clean_season_df)
+
+    season_feature_cache[(store_dir, year)] = clean_season_df
+
+    return clean_season_df
+
+
+def invalidate_season_features(years=None, store_dir=None):
+    """Discard built season stats so that they're rebuilt on their next use
+
+    Parameters
+    ----------
+    years : list, optional
+        Years to discard (default=None, every year held in memory or in the store directory)
+    store_dir : str, optional
+        Directory where season stats are stored; stored years (and their dataset partitions)
+        are removed as well (default=None, 'season_store_dir')
+    """
+    store_dir = store_dir if (store_dir is not None) else season_store_dir
+    if years is None:
+        years = {year for _, year in season_feature_cache}
+        if store_dir is not None:
+            years |= set(stored_years(store_dir)) | set(stored_season_years(store_dir))
+
+    # A discarded year is rebuilt whichever store it was loaded from
+    for key in [key for key in season_feature_cache if key[1] in years]:
+        season_feature_cache.pop(key)
+
+    if store_dir is not None:
+        invalidate_years(store_dir, sorted(years))
+
+
+def hist_tournament_games(year, clean_season_df):
     """Fetch and clean all tournament data for a given year
 
     Parameters
     ----------
     year : int
         Calendar year
-    all_stats : DataFrame
-        Complete data for all regular season team and coach stats
-    basic_stats : DataFrame
-        Cleaned basic regular season stats for all teams in given year
+    clean_season_df : DataFrame
+        Complete, cleaned data for all regular season team and coach stats
 
     Returns
     -------
     mm_data_df : DataFrame
         Complete dataset for given year
     """
-    # Reclean all team names & season stats (prior to merging of tournament games)
-    clean_all_season_stats_df = clean_merged_season_stats(year, all_stats, basic_stats)
-    
     # Fetch tournament game data
-    mm_games_df = get_team_data(url=("https://apps.washingtonpost.com/sports/search/?pri_school_id=&pri_conference=&pri_coach"
-                                "=&pri_seed_from=1&pri_seed_to=16&pri_power_conference=&pri_bid_type=&opp_school_id"
-                                "=&opp_conference=&opp_coach=&opp_seed_from=1&opp_seed_to=16&opp_power_conference"
-                                f"=&opp_bid_type=&game_type=7&from={year}&to={year}&submit="), 
-                                attrs={'class': 'search-results'}, header=0)
+    mm_games_df = get_team_data(url=season_urls['tourney'].format(year=year), attrs={'class': 'search-results'}, header=0)
     
     # Clean & merge regular season data to tournament games (if they exist for given year)
     if not mm_games_df.empty:
-        clean_mm_df = clean_tourney_data(year, mm_games_df, clean_all_season_stats_df)
-        mm_data_df = merge_clean_tourney_games(clean_mm_df, clean_all_season_stats_df)
+        clean_mm_df = clean_tourney_data(year, mm_games_df, clean_season_df)
+        mm_data_df = merge_clean_tourney_games(clean_mm_df, clean_season_df)
     else:
         mm_data_df = pd.DataFrame()
 
     return mm_data_df
 
 
-def dataset_pipeline(years):
+def dataset_pipeline(years, prefetch=True, store_dir=None, columns=None):
     """Create complete dataset over the range of years passed as an input
 
     Parameters
     ----------
     years : list
         Range of years to include in constructing the dataset
+    prefetch : bool, optional
+        Download all years' web pages concurrently before processing them (default=True)
+    store_dir : str, optional
+        Directory of the year-partitioned dataset store; only years missing from it are
+        built (and then added to it, along with their season stats) (default=None, build 
+        every year without storing it)
+    columns : list, optional
+        Columns to load from the dataset store (default=None, all columns)
 
     Returns
     -------
     all_data_df : DataFrame
         Complete dataset
     """
-    all_data_df = pd.DataFrame()
+    # Only build the years that aren't stored already
+    if store_dir is not None:
+        built_years = set(stored_years(store_dir))
+        years_to_build = [year for year in years if year not in built_years]
+    else:
+        years_to_build = list(years)
 
-    for year in years:
-        # Fetch. clean, and merge all regular season team and coach data    
-        all_season_stats_df, clean_season_basic_df = all_team_season_data(year)
+    # Warm the page cache so that each year below reads its web pages from disk
+    if prefetch and years_to_build:
+        prefetch_season_pages(years_to_build)
+
+    year_dfs = []
+
+    for year in years_to_build:
+        # Merge tournament data to (stored or newly built) regular season data for given year
+        year_mm_data_df = hist_tournament_games(year, season_features(year, store_dir))
 
-        # Merge tournament data to regular season data to create complete dataset for given year
-        year_mm_data_df = hist_tournament_games(year, all_season_stats_df, clean_season_basic_df)
+        # Store current year's data as its own partition, or keep it for concatenation below
+        if store_dir is not None:
+            write_year_partition(store_dir, year, year_mm_data_df)
+        elif not year_mm_data_df.empty:
+            year_dfs.append(year_mm_data_df)
 
-        # Concatenate current year's data to DataFrame containing remainder of dataset
-        all_data_df = pd.concat([all_data_df, year_mm_data_df], ignore_index=True)
+    # Assemble the complete dataset with a single concatenation
+    if store_dir is not None:
+        all_data_df = read_partitions(store_dir, years, columns)
+    else:
+        all_data_df = pd.concat(year_dfs, ignore_index=True) if year_dfs else pd.DataFrame()
 
     return all_data_df
 
@@ -206,28 +353,19 @@ def feature_pipeline(primary_df, fit_df):
     ----------
     primary_df : DataFrame
         Dataset to engineer; always used to transform StandardScaler()
-    trans_df : DataFrame
-        Dataset used to fit StandardScaler()
+    fit_df : DataFrame or MatchupPreprocessor
+        Dataset used to fit StandardScaler(), or an already fitted preprocessor to reuse
 
     Returns
     -------
     full_feature_df : DataFrame
         Complete dataset with re-engineered features
     """
-    # Reclassify the 'Round' feature accordingly (if it's even present)
-    try:
-        bidirectional_rounds_str_numeric(primary_df)
-    except KeyError:
-        pass
-
-    # Convert team points/game features into point differential features
-    team_points_differentials(primary_df)
-
-    # Convert favorite-underdog features to a single class of underdog relative feature
-    matchups_to_underdog_relative(primary_df)
+    # Reclassify rounds, create point differentials & underdog relative features
+    engineer_matchup_features(primary_df)
 
     # 'Center the data' for all numerical features; improves models' signal processing abilities
-    full_feature_df = scale_features(primary_df, fit_df)
+    full_feature_df = get_preprocessor(fit_df).transform(primary_df)
 
     return full_feature_df
 
@@ -245,8 +383,8 @@ def round_pipeline(year, curr_round, all_curr_matchups, clean_curr_season_data,
         Tournament matchups used for model prediction; 1 round per index
     clean_curr_season_data : DataFrame
         Complete data for all regular season team and coach stats
-    fit_df : DataFrame
-        Dataset used to fit StandardScaler()
+    fit_df : DataFrame or MatchupPreprocessor
+        Dataset used to fit StandardScaler(), or an already fitted preprocessor to reuse
     null_drops : list
         Set of features to drop from whole dataset prior to model prediction
 
@@ -259,14 +397,13 @@ def round_pipeline(year, curr_round, all_curr_matchups, clean_curr_season_data,
     school_matchups_df : DataFrame
         Summarized tournament data to show in Jupyter notebook
     """    
-    # Generate predicted\selected round
+    # Generate predicted\selected round (generated rounds already have integer seeds)
     if curr_round not in [0, 1]:
         generated_round = create_bracket_round(all_curr_matchups[curr_round-1])
     else:
         generated_round = all_curr_matchups[curr_round]
-
-    # Ensure matchup seeds are integers for proper favorite-underdog identification
-    generated_round[['Seed', 'Seed.1']] = generated_round[['Seed', 'Seed.1']].astype(int)
+        # Ensure selected matchup seeds are integers for proper favorite-underdog identification
+        generated_round[['Seed', 'Seed.1']] = generated_round[['Seed', 'Seed.1']].astype(int)
 
     # Cleaned tournament matchup dataset
     cleaned_generated_round = clean_tourney_data(year, generated_round, clean_curr_season_data)
@@ -299,8 +436,8 @@ def bracket_pipeline(year, play_in, first_round, model, fit_df, null_drops):
         Scraped matchups from the first round (non-generated)
     model : sklearn.base.BaseEstimator
         Model of choice for tournament matchup predictions
-    fit_df : DataFrame
-        Dataset used to fit StandardScaler()
+    fit_df : DataFrame or MatchupPreprocessor
+        Dataset used to fit StandardScaler(), or an already fitted preprocessor to reuse
     null_drops : list
         Set of features to drop from whole dataset prior to model prediction
 
@@ -309,9 +446,11 @@ def bracket_pipeline(year, play_in, first_round, model, fit_df, null_drops):
     bracket_preds : DataFrame
         Completely generated, properly formatted bracket
     """  
+    # Fit feature preprocessing once; every round below reuses it
+    preprocessor = get_preprocessor(fit_df)
+
     # Get all team & coach season stats
-    all_curr_season_data, curr_season_basic_df = all_team_season_data(year)
-    clean_curr_season_data = clean_merged_season_stats(year, all_curr_season_data, curr_season_basic_df)
+    clean_curr_season_data = season_features(year)
 
     # Initialize lists for use in generating/storing rounds
     all_curr_matchups = [play_in, first_round]
@@ -320,7 +459,7 @@ def bracket_pipeline(year, play_in, first_round, model, fit_df, null_drops):
     for curr_round in range(7):
         # Get all data needed for current generated/selected round    
         all_round_data, curr_X, school_matchups_df = round_pipeline(year, curr_round, all_curr_matchups, 
-                                                                    clean_curr_season_data, fit_df, null_drops)
+                                                                    clean_curr_season_data, preprocessor, null_drops)
         # Create predictions
         school_matchups_df['Underdog_Upset'] = model.predict(curr_X)
         
@@ -343,4 +482,320 @@ def bracket_pipeline(year, play_in, first_round, model, fit_df, null_drops):
     bracket_preds = clean_bracket(all_curr_matchups, all_curr_rounds)
     create_bracket_winners(bracket_preds)
 
-    return bracket_preds
\ No newline at end of file
+    return bracket_preds
+
+
+def field_matchup_features(year, field, faves, underdogs, clean_curr_season_data, preprocessor, null_drops):
+    """Build the model-ready feature rows for matchups of team IDs in a field
+
+    Parameters
+    ----------
+    year : int
+        Current calendar year
+    field : dict
+        Tournament field created by create_bracket_field()
+    faves, underdogs : ndarray
+        Team IDs of each matchup's favorite & underdog
+    clean_curr_season_data : DataFrame
+        Complete data for all regular season team and coach stats
+    preprocessor : DataFrame or MatchupPreprocessor
+        Dataset used to fit StandardScaler(), or an already fitted preprocessor to reuse
+    null_drops : list
+        Set of features to drop from whole dataset prior to model prediction
+
+    Returns
+    -------
+    curr_X : DataFrame
+        Tournament matchups used for model prediction; one row per requested matchup, in order
+    """
+    # Underdogs are listed first: when seed & record are both equivalent, favorite_mask()
+    # (used by both orient_matchups() and create_faves_underdogs()) picks the second team listed
+    teams, seeds = field['teams'], field['seeds']
+    matchups = pd.DataFrame({
+        'Seed': seeds[underdogs], 
+        'Team': teams[underdogs], 
+        'Seed.1': seeds[faves], 
+        'Team.1': teams[faves],
+    })
+
+    # Clean matchups and merge all team season data onto them
+    cleaned_matchups = clean_tourney_data(year, matchups, clean_curr_season_data)
+    all_matchup_data = merge_clean_tourney_games(cleaned_matchups, clean_curr_season_data)
+
+    # Line rows back up with the requested matchups by team ID (merging drops teams without season data)
+    teams_cols = ['Team_Favorite', 'Team_Underdog']
+    matchup_ids = pd.MultiIndex.from_arrays([team_ids(all_matchup_data[col]) for col in teams_cols])
+    first_rows = ~matchup_ids.duplicated()
+    all_matchup_data = all_matchup_data[first_rows].drop(teams_cols, axis=1).set_index(matchup_ids[first_rows])
+    requested = pd.MultiIndex.from_arrays([team_ids(teams[faves]), team_ids(teams[underdogs])])
+
+    unmatched = ~requested.isin(all_matchup_data.index)
+    if unmatched.any():
+        unmatched_teams = sorted(set(teams[faves][unmatched]) | set(teams[underdogs][unmatched]))
+        missing = [team for team, team_id in zip(unmatched_teams, team_ids(unmatched_teams))
+                   if team_id not in clean_curr_season_data.index]
+        if missing:
+            raise ValueError(f"Matchups couldn't be scored; check season data for these teams: {missing}")
+        raise ValueError(f"Matchups' favorites disagree with the requested favorites for these teams: {unmatched_teams}")
+
+    all_matchup_data = all_matchup_data.reindex(requested).reset_index(drop=True)
+
+    # Prepare DataFrame for prediction via feature pipeline preprocessing
+    curr_X = feature_pipeline(all_matchup_data.drop(null_drops, axis=1), preprocessor)
+
+    return curr_X
+
+
+def field_matchup_scorer(year, field, clean_curr_season_data, model, preprocessor, null_drops):
+    """Create a function that predicts upset probabilities for matchups of team IDs in a field
+
+    Parameters
+    ----------
+    year : int
+        Current calendar year
+    field : dict
+        Tournament field created by create_bracket_field()
+    clean_curr_season_data : DataFrame
+        Complete data for all regular season team and coach stats
+    model : sklearn.base.BaseEstimator
+        Model of choice for tournament matchup predictions
+    preprocessor : DataFrame or MatchupPreprocessor
+        Dataset used to fit StandardScaler(), or an already fitted preprocessor to reuse
+    null_drops : list
+        Set of features to drop from whole dataset prior to model prediction
+
+    Returns
+    -------
+    score_matchups : callable
+        Takes favorites' and underdogs' team IDs, returns the probability of each upset
+    """
+    def score_matchups(faves, underdogs):
+        curr_X = field_matchup_features(year, field, faves, underdogs, clean_curr_season_data, preprocessor, null_drops)
+        return upset_probabilities(model, curr_X)
+
+    return score_matchups
+
+
+def matchup_matrix_pipeline(year, play_in, first_round, model, fit_df, null_drops):
+    """Score every possible matchup of the current year's field with a single model call
+
+    Parameters
+    ----------
+    year : int
+        Current calendar year
+    play_in : DataFrame
+        Scraped matchups from the play-in round (non-generated)
+    first_round : DataFrame
+        Scraped matchups from the first round (non-generated)
+    model : sklearn.base.BaseEstimator
+        Model of choice for tournament matchup predictions; predict_proba() is used if available
+    fit_df : DataFrame or MatchupPreprocessor
+        Dataset used to fit StandardScaler(), or an already fitted preprocessor to reuse
+    null_drops : list
+        Set of features to drop from whole dataset prior to model prediction
+
+    Returns
+    -------
+    field : dict
+        Tournament field encoded as integer team IDs
+    win_matrix : ndarray
+        Win probability of every team (rows) against every other team (columns)
+    """
+    # Get all team & coach season stats
+    clean_curr_season_data = season_features(year)
+
+    # Build & score the feature rows of all pairings in one batch
+    field = create_bracket_field(play_in, first_round, clean_curr_season_data)
+    score_matchups = field_matchup_scorer(year, field, clean_curr_season_data, model, 
+                                          get_preprocessor(fit_df), null_drops)
+    win_matrix = complete_win_matrix(field, score_matchups)
+
+    return field, win_matrix
+
+
+def simulation_pipeline(year, play_in, first_round, model, fit_df, null_drops, n_sims=1000000, random_state=42):
+    """Simulate the current year's tournament many times to estimate each team's advancement odds
+
+    Parameters
+    ----------
+    year : int
+        Current calendar year
+    play_in : DataFrame
+        Scraped matchups from the play-in round (non-generated)
+    first_round : DataFrame
+        Scraped matchups from the first round (non-generated)
+    model : sklearn.base.BaseEstimator
+        Model of choice for tournament matchup predictions; predict_proba() is used if available
+    fit_df : DataFrame or MatchupPreprocessor
+        Dataset used to fit StandardScaler(), or an already fitted preprocessor to reuse
+    null_drops : list
+        Set of features to drop from whole dataset prior to model prediction
+    n_sims : int, optional
+        Number of tournaments to simulate (default=1000000)
+    random_state : int, optional
+        Seed for reproducible simulations (default=42)
+
+    Returns
+    -------
+    DataFrame
+        Each team's probability of reaching each round, and of winning the title
+    """
+    field, win_matrix = matchup_matrix_pipeline(year, play_in, first_round, model, fit_df, null_drops)
+    reach_probs = simulate_tournament(field, win_matrix, n_sims, random_state)
+
+    return advancement_table(field, reach_probs)
+
+
+def advancement_pipeline(year, play_in, first_round, model, fit_df, null_drops):
+    """Compute each team's exact odds of advancing through the current year's tournament
+
+    Parameters
+    ----------
+    year : int
+        Current calendar year
+    play_in : DataFrame
+        Scraped matchups from the play-in round (non-generated)
+    first_round : DataFrame
+        Scraped matchups from the first round (non-generated)
+    model : sklearn.base.BaseEstimator
+        Model of choice for tournament matchup predictions; predict_proba() is used if available
+    fit_df : DataFrame or MatchupPreprocessor
+        Dataset used to fit StandardScaler(), or an already fitted preprocessor to reuse
+    null_drops : list
+        Set of features to drop from whole dataset prior to model prediction
+
+    Returns
+    -------
+    DataFrame
+        Each team's probability of reaching each round, and of winning the title
+    """
+    field, win_matrix = matchup_matrix_pipeline(year, play_in, first_round, model, fit_df, null_drops)
+    reach_probs = exact_advancement(field, win_matrix)
+
+    return advancement_table(field, reach_probs)
+
+
+def optimal_bracket_pipeline(year, play_in, first_round, model, fit_df, null_drops, round_points=None, top_k=5):
+    """Generate the brackets with the most expected points in a bracket pool
+
+    Parameters
+    ----------
+    year : int
+        Current calendar year
+    play_in : DataFrame
+        Scraped matchups from the play-in round (non-generated)
+    first_round : DataFrame
+        Scraped matchups from the first round (non-generated)
+    model : sklearn.base.BaseEstimator
+        Model of choice for tournament matchup predictions; predict_proba() is used if available
+    fit_df : DataFrame or MatchupPreprocessor
+        Dataset used to fit StandardScaler(), or an already fitted preprocessor to reuse
+    null_drops : list
+        Set of features to drop from whole dataset prior to model prediction
+    round_points : list, optional
+        Points for each correct pick by round, play-in through championship
+        (default=None, ESPN-style 0, 10, 20, 40, 80, 160, 320)
+    top_k : int, optional
+        Number of brackets to generate; the best bracket for each of the top_k champions (default=5)
+
+    Returns
+    -------
+    all_brackets : DataFrame
+        Generated brackets, labeled by their 'Rank' & 'Expected_Points' (rank 1 is optimal)
+    """
+    field, win_matrix = matchup_matrix_pipeline(year, play_in, first_round, model, fit_df, null_drops)
+    reach_probs = exact_advancement(field, win_matrix)
+
+    all_brackets = []
+    for rank, (points, picks) in enumerate(optimize_bracket(field, reach_probs, round_points, top_k), start=1):
+        bracket_preds = picks_to_bracket(field, picks)
+        bracket_preds.insert(0, 'Rank', rank)
+        bracket_preds.insert(1, 'Expected_Points', points)
+        all_brackets.append(bracket_preds)
+
+    return pd.concat(all_brackets, ignore_index=True)
+
+
+def live_tournament_pipeline(year, play_in, first_round, model, fit_df, null_drops, threshold=0.5):
+    """Start tracking the current year's tournament; results are then added with record_result()
+
+    Parameters
+    ----------
+    year : int
+        Current calendar year
+    play_in : DataFrame
+        Scraped matchups from the play-in round (non-generated)
+    first_round : DataFrame
+        Scraped matchups from the first round (non-generated)
+    model : sklearn.base.BaseEstimator
+        Model of choice for tournament matchup predictions; predict_proba() is used if available
+    fit_df : DataFrame or MatchupPreprocessor
+        Dataset used to fit StandardScaler(), or an already fitted preprocessor to reuse
+    null_drops : list
+        Set of features to drop from whole dataset prior to model prediction
+    threshold : float, optional
+        Upset probability above which the underdog is picked (default=0.5)
+
+    Returns
+    -------
+    dict
+        Live tournament state; see live_bracket() & live_advancement() for its predictions
+    """
+    field, win_matrix = matchup_matrix_pipeline(year, play_in, first_round, model, fit_df, null_drops)
+
+    return init_live_tournament(field, win_matrix, threshold)
+
+
+def multi_bracket_pipeline(year, play_in, first_round, configs, fit_df, null_drops, max_workers=None):
+    """Generate brackets for many model & decision threshold configurations at once
+
+    Parameters
+    ----------
+    year : int
+        Current calendar year
+    play_in : DataFrame
+        Scraped matchups from the play-in round (non-generated)
+    first_round : DataFrame
+        Scraped matchups from the first round (non-generated)
+    configs : list
+        (model name, model, threshold) tuples; an upset is picked when its probability exceeds the threshold
+    fit_df : DataFrame or MatchupPreprocessor
+        Dataset used to fit StandardScaler(), or an already fitted preprocessor to reuse
+    null_drops : list
+        Set of features to drop from whole dataset prior to model prediction
+    max_workers : int, optional
+        Number of processes scoring models in parallel (default=None, one per CPU)
+
+    Returns
+    -------
+    all_brackets : DataFrame
+        Every generated bracket, labeled by its 'Model' & 'Threshold'
+    """
+    # Get all team & coach season stats
+    clean_curr_season_data = season_features(year)
+
+    # Features of every possible matchup are shared by all models
+    field = create_bracket_field(play_in, first_round, clean_curr_season_data)
+    faves, underdogs = field_matchups(field)
+    curr_X = field_matchup_features(year, field, faves, underdogs, clean_curr_season_data, 
+                                    get_preprocessor(fit_df), null_drops)
+
+    # Each model scores all matchups once, then generates a bracket per threshold
+    models, model_threshs = {}, {}
+    for name, model, thresh in configs:
+        if models.setdefault(name, model) is not model:
+            raise ValueError(f"Model name '{name}' is used by more than one model")
+        model_threshs.setdefault(name, []).append(thresh)
+
+    all_brackets = []
+    with ProcessPoolExecutor(max_workers) as executor:
+        futures = {name: executor.submit(score_brackets, field, faves, underdogs, curr_X, model, model_threshs[name])
+                   for name, model in models.items()}
+
+        for name, future in futures.items():
+            for thresh, bracket_preds in zip(model_threshs[name], future.result()):
+                bracket_preds.insert(0, 'Model', name)
+                bracket_preds.insert(1, 'Threshold', thresh)
+                all_brackets.append(bracket_preds)
+
+    return pd.concat(all_brackets, ignore_index=True)
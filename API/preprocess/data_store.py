@@ -0,0 +1,361 @@
+"""Data Store Helper Functions
+
+This script is used as a helper module in the data_pipeline script;
+also used as a module in the March_Madness_Predictions Jupyter notebooks.
+
+The historical dataset is stored as one partition per year, along with a manifest of
+the years that have been built (including years without a tournament, i.e. 2020).
+Only missing or invalidated years need to be fetched and processed again. Each year's cleaned
+season stats (one row per team) are stored alongside, so that every pipeline reuses them.
+
+Datasets (year partitions, generated brackets) are stored in a typed columnar format
+(Feather, or Parquet by file extension) with an explicit schema, so loading them needs no
+text parsing or dtype inference, and only the columns of interest have to be read.
+Large collections of brackets (i.e. simulated tournaments) are stored in bulk as compact
+bracket codes, along with the tournament field needed to decode them.
+
+The following functions are present:
+    * apply_schema
+    * save_dataset
+    * load_dataset
+    * read_manifest
+    * stored_years
+    * write_year_partition
+    * invalidate_years
+    * read_partitions
+    * write_season_features
+    * stored_season_years
+    * read_season_features
+    * save_brackets
+    * load_brackets
+
+Requires a minimum of the 'pandas', 'numpy', and 'pyarrow' libraries, as well as the 'team_registry'
+helper module, being present in your environment to run.
+"""
+
+import json
+import os
+import re
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as parquet
+from datetime import datetime
+from team_registry import team_index
+
+# Explicit column types; all remaining columns are stored as float64 team stats
+schema_dtypes = {
+    'Year': 'int16',
+    'School': 'object',
+    'Round': 'object',
+    'Seed_Favorite': 'int8',
+    'Team_Favorite': 'object',
+    'Seed_Underdog': 'int8',
+    'Team_Underdog': 'object',
+    'Underdog_Upset': 'int8',
+    'Winner': 'object',
+}
+
+
+def apply_schema(df):
+    """Cast a dataset's columns to their stored types
+
+    Parameters
+    ----------
+    df : DataFrame
+        Tournament dataset or bracket predictions
+
+    Returns
+    -------
+    DataFrame
+        Copy of df with explicitly typed columns
+    """
+    dtypes = {col: schema_dtypes.get(col, 'float64') for col in df.columns}
+    # Round is kept as given, whether it holds round names or round numbers
+    if ('Round' in df.columns) and (df['Round'].dtype != object):
+        dtypes['Round'] = 'int8'
+
+    return df.astype(dtypes)
+
+
+def save_dataset(df, path):
+    """Store a dataset in typed columnar format
+
+    Parameters
+    ----------
+    df : DataFrame
+        Tournament dataset or bracket predictions
+    path : str
+        File to write; '.parquet' files are stored as Parquet, all others as Feather
+    """
+    table = pa.Table.from_pandas(apply_schema(df), preserve_index=False)
+
+    if path.endswith('.parquet'):
+        parquet.write_table(table, path)
+    else:
+        # Uncompressed Feather files can be memory-mapped when loaded
+        feather.write_feather(table, path, compression='uncompressed')
+
+
+def load_dataset(path, columns=None):
+    """Load a dataset stored with save_dataset()
+
+    Parameters
+    ----------
+    path : str
+        File to read
+    columns : list, optional
+        Columns to load (default=None, all columns)
+
+    Returns
+    -------
+    DataFrame
+        Stored dataset
+    """
+    if path.endswith('.parquet'):
+        table = parquet.read_table(path, columns=columns, memory_map=True)
+    else:
+        table = feather.read_table(path, columns=columns, memory_map=True)
+
+    return table.to_pandas()
+
+
+def _manifest_path(store_dir):
+    return os.path.join(store_dir, 'manifest.json')
+
+
+def _partition_path(store_dir, year):
+    return os.path.join(store_dir, f"year={year}.feather")
+
+
+def _season_path(store_dir, year):
+    return os.path.join(store_dir, f"season={year}.feather")
+
+
+def _write_manifest(store_dir, manifest):
+    # Replace the manifest in a single step so it's never left half-written
+    tmp_path = _manifest_path(store_dir) + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, _manifest_path(store_dir))
+
+
+def read_manifest(store_dir):
+    """Read the record of all years stored in the dataset store
+
+    Parameters
+    ----------
+    store_dir : str
+        Directory holding the year partitions
+
+    Returns
+    -------
+    dict
+        Row count and build time of each stored year, keyed by year (as a str)
+    """
+    try:
+        with open(_manifest_path(store_dir), 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def stored_years(store_dir):
+    """Get the years already stored in the dataset store
+
+    Parameters
+    ----------
+    store_dir : str
+        Directory holding the year partitions
+
+    Returns
+    -------
+    list
+        Sorted stored years
+    """
+    return sorted(int(year) for year in read_manifest(store_dir))
+
+
+def write_year_partition(store_dir, year, year_df):
+    """Store a single year of the dataset, replacing any previous version
+
+    Parameters
+    ----------
+    store_dir : str
+        Directory holding the year partitions
+    year : int
+        Calendar year
+    year_df : DataFrame
+        Complete dataset for given year (empty if no tournament took place)
+    """
+    os.makedirs(store_dir, exist_ok=True)
+
+    # Years without tournament games are only recorded in the manifest
+    if not year_df.empty:
+        save_dataset(year_df, _partition_path(store_dir, year))
+
+    manifest = read_manifest(store_dir)
+    manifest[str(year)] = {
+        'rows': len(year_df),
+        'built': datetime.now().isoformat(timespec='seconds'),
+    }
+    _write_manifest(store_dir, manifest)
+
+
+def invalidate_years(store_dir, years):
+    """Remove years (and their season stats) from the dataset store so that they're rebuilt on the next run
+
+    Parameters
+    ----------
+    store_dir : str
+        Directory holding the year partitions
+    years : list
+        Years to remove
+    """
+    manifest = read_manifest(store_dir)
+
+    for year in years:
+        manifest.pop(str(year), None)
+        for path in [_partition_path(store_dir, year), _season_path(store_dir, year)]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    if os.path.isdir(store_dir):
+        _write_manifest(store_dir, manifest)
+
+
+def read_partitions(store_dir, years, columns=None):
+    """Assemble the dataset from the stored partitions of the given years
+
+    Parameters
+    ----------
+    store_dir : str
+        Directory holding the year partitions
+    years : list
+        Years to include in the dataset
+    columns : list, optional
+        Columns to load (default=None, all columns)
+
+    Returns
+    -------
+    DataFrame
+        Complete dataset over the given years
+    """
+    manifest = read_manifest(store_dir)
+    year_dfs = [load_dataset(_partition_path(store_dir, year), columns) for year in years
+                if manifest.get(str(year), {}).get('rows', 0) > 0]
+
+    # Concatenate all partitions at once
+    return pd.concat(year_dfs, ignore_index=True) if year_dfs else pd.DataFrame()
+
+
+def write_season_features(store_dir, year, season_df):
+    """Store a year's cleaned season stats, replacing any previous version
+
+    Parameters
+    ----------
+    store_dir : str
+        Directory holding the year partitions
+    year : int
+        Calendar year
+    season_df : DataFrame
+        Cleaned regular season stats for all teams in given year
+    """
+    os.makedirs(store_dir, exist_ok=True)
+
+    # Team IDs only hold within a session; they're rebuilt from the school names when loaded
+    save_dataset(season_df.reset_index(drop=True), _season_path(store_dir, year))
+
+
+def stored_season_years(store_dir):
+    """Get the years whose cleaned season stats are stored
+
+    Parameters
+    ----------
+    store_dir : str
+        Directory holding the year partitions
+
+    Returns
+    -------
+    list
+        Sorted years with stored season stats
+    """
+    if not os.path.isdir(store_dir):
+        return []
+
+    return sorted(int(match.group(1)) for match in map(re.compile(r'season=(\d+)\.feather$').match, os.listdir(store_dir))
+                  if match)
+
+
+def read_season_features(store_dir, year):
+    """Load a year's cleaned season stats stored with write_season_features()
+
+    Parameters
+    ----------
+    store_dir : str
+        Directory holding the year partitions
+    year : int
+        Calendar year
+
+    Returns
+    -------
+    season_df : DataFrame or None
+        Cleaned regular season stats for all teams in given year (indexed by team ID); None if not stored
+    """
+    if not os.path.exists(_season_path(store_dir, year)):
+        return None
+
+    season_df = load_dataset(_season_path(store_dir, year))
+    season_df.index = team_index(season_df['School'])
+
+    return season_df
+
+
+def save_brackets(path, field, codes):
+    """Store many brackets in bulk as compact bracket codes
+
+    Parameters
+    ----------
+    path : str
+        File to write ('.npz')
+    field : dict
+        Tournament field the brackets were generated from
+    codes : ndarray
+        uint8 bracket codes, one row per bracket
+    """
+    np.savez(
+        path,
+        codes=codes,
+        teams=np.asarray(field['teams'], dtype=str),
+        seeds=field['seeds'].astype('int8'),
+        win_pcts=field['win_pcts'],
+        slots=field['slots'].astype('int8'),
+        play_in=field['play_in'].astype('uint8'),
+    )
+
+
+def load_brackets(path):
+    """Load brackets stored with save_brackets()
+
+    Parameters
+    ----------
+    path : str
+        File to read
+
+    Returns
+    -------
+    field : dict
+        Tournament field the brackets were generated from
+    codes : ndarray
+        uint8 bracket codes, one row per bracket
+    """
+    with np.load(path) as stored:
+        field = {key: stored[key] for key in ['teams', 'seeds', 'win_pcts', 'slots', 'play_in']}
+        codes = stored['codes']
+
+    # Team IDs index into the field's arrays
+    field['slots'] = field['slots'].astype(int)
+    field['play_in'] = field['play_in'].astype(int)
+
+    return field, codes
@@ -2,13 +2,18 @@
 
 This script is used as a helper module in the data_clean and data_pipeline scripts.
 
-The following functions are present:
+The following functions (and classes) are present:
     * totals_to_game_average
+    * favorite_mask
     * create_faves_underdogs
     * team_points_differentials
     * bidirectional_rounds_str_numeric
     * matchups_to_underdog_relative
     * scale_features
+    * engineer_matchup_features
+    * MatchupPreprocessor
+    * get_preprocessor
+    * advance_round
     * create_bracket_round
     * create_bracket_winners
     * create_target_variable
@@ -19,7 +24,9 @@ the 'data_integrity' helper module, being present in your environment to run.
 
 import pandas as pd
 import numpy as np
+from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.preprocessing import StandardScaler
+from sklearn.utils.validation import check_is_fitted
 from data_integrity import rounds_str_to_numeric, rounds_numeric_to_str
 
 
@@ -45,6 +52,27 @@ def totals_to_game_average(all_season_df, season_basic_df):
             all_season_df.drop(col, axis=1, inplace=True)
 
 
+def favorite_mask(seeds, seeds1, win_pcts, win_pcts1):
+    """Decide which team of each matchup is the favorite
+
+    The favorite has the better seed, or the better record when seeds are equivalent;
+    when both are equivalent, the second team listed is the favorite.
+
+    Parameters
+    ----------
+    seeds, seeds1 : ndarray
+        Seeds of each matchup's first & second team
+    win_pcts, win_pcts1 : ndarray
+        Regular season win percentages of each matchup's first & second team
+
+    Returns
+    -------
+    ndarray
+        True where the first team is the favorite
+    """
+    return (seeds < seeds1) | ((seeds == seeds1) & (win_pcts > win_pcts1))
+
+
 def create_faves_underdogs(mm_df, season_df):
     """Convert team listings into favorites-underdogs matchups
 
@@ -53,54 +81,33 @@ def create_faves_underdogs(mm_df, season_df):
     mm_df : DataFrame
         Freshly scraped tournament matchup data
     season_df : DataFrame
-        Cleaned basic regular season team stats
+        Cleaned basic regular season team stats (indexed by team ID)
 
     Returns
     -------
     faves_unds : dict
-        Two arrays, one containing team matchup data for favorites and the other for underdogs
+        Two DataFrames, one containing team matchup data for favorites and the other for underdogs
     """
-    faves, underdogs = [], []
-
-    for index, data in mm_df.iterrows():
-        # Get team matchup data
-        # Seed --> team_arr, Seed.1 --> team1_arr
-        try:
-            team_arr = [data['Seed'], data['Team'], data['Score']]
-            team1_arr = [data['Seed.1'], data['Team.1'], data['Score.1']]
-        # Catch key error for missing scores (when creating tournament matchups outside of dataset)
-        except KeyError:
-            team_arr = [data['Seed'], data['Team']]
-            team1_arr = [data['Seed.1'], data['Team.1']]
-
-        # In this case, the team linked to Seed is the underdog; populate corresponding arrays
-        if data['Seed.1'] < data['Seed']:
-            underdogs.append(team_arr)
-            faves.append(team1_arr)
-
-        # In this case, the team linked to Seed.1 is the underdog; populate corresponding arrays
-        elif data['Seed.1'] > data['Seed']:
-            underdogs.append(team1_arr)
-            faves.append(team_arr)
-
-        # Seeds are equivalent
-        else:
-            # Get regular season win percentage for both teams
-            team_win_pct = float(season_df[season_df['School'] == data['Team']]['W-L%'])
-            team1_win_pct = float(season_df[season_df['School'] == data['Team.1']]['W-L%'])
-            
-            # Whoever has the better record is the favorite, else they're the underdog; populate corresponding arrays
-            if team_win_pct > team1_win_pct:
-                underdogs.append(team1_arr)
-                faves.append(team_arr)
-            else:
-                underdogs.append(team_arr)
-                faves.append(team1_arr)
-
-    # Return favorite-underdogs arrays as a single dictionary, referenced by their corresponding key
+    # Get team matchup data; scores are missing when creating tournament matchups outside of dataset
+    # Seed --> team columns, Seed.1 --> team1 columns
+    team_cols = [col for col in ['Seed', 'Team', 'Team_ID', 'Score'] if (col in mm_df.columns) and (col + '.1' in mm_df.columns)]
+    seeds = mm_df['Seed'].to_numpy()
+    seeds1 = mm_df['Seed.1'].to_numpy()
+
+    # Look up regular season win percentage for both teams (used when seeds are equivalent)
+    win_pcts = season_df['W-L%'].astype(float)
+    win_pcts = win_pcts[~win_pcts.index.duplicated()]
+    team_win_pcts = win_pcts.reindex(mm_df['Team_ID']).to_numpy()
+    team1_win_pcts = win_pcts.reindex(mm_df['Team_ID.1']).to_numpy()
+
+    # The team linked to Seed is the favorite if it has the better seed, 
+    # or the better record when seeds are equivalent; otherwise the team linked to Seed.1 is
+    team_is_fave = favorite_mask(seeds, seeds1, team_win_pcts, team1_win_pcts)
+
+    # Return favorite-underdogs DataFrames as a single dictionary, referenced by their corresponding key
     faves_unds = {
-        'Favorite': np.array(faves),
-        'Underdog': np.array(underdogs)
+        'Favorite': pd.DataFrame({col: np.where(team_is_fave, mm_df[col], mm_df[col + '.1']) for col in team_cols}),
+        'Underdog': pd.DataFrame({col: np.where(team_is_fave, mm_df[col + '.1'], mm_df[col]) for col in team_cols}),
     }
 
     return faves_unds
@@ -180,6 +187,140 @@ def scale_features(primary_df, fit_df):
     return full_df
 
 
+def engineer_matchup_features(df):
+    """Construct all matchup features; reclassified rounds, point differentials, and underdog relative features
+
+    Parameters
+    ----------
+    df : DataFrame
+        Fully merged and cleaned tournament data
+    """
+    # Reclassify the 'Round' feature accordingly (if it's even present)
+    try:
+        bidirectional_rounds_str_numeric(df)
+    except KeyError:
+        pass
+
+    # Convert team points/game features into point differential features
+    team_points_differentials(df)
+
+    # Convert favorite-underdog features to a single class of underdog relative feature
+    matchups_to_underdog_relative(df)
+
+
+class MatchupPreprocessor(TransformerMixin, BaseEstimator):
+    """Fit-once preprocessing of tournament matchups (feature construction & scaling)
+
+    Fitting captures the engineered feature order and the scaling statistics, so every later
+    round or bracket is transformed without refitting. Being an sklearn transformer, a fitted
+    preprocessor can be placed in a Pipeline or persisted with joblib.
+
+    Attributes
+    ----------
+    feature_names_ : list
+        Engineered feature columns, in the order used for scaling
+    scaler_ : StandardScaler
+        Scaler fitted on the engineered training features
+    """
+
+    def fit(self, X, y=None):
+        """Fit scaling statistics on (raw or already engineered) training matchups
+
+        Parameters
+        ----------
+        X : DataFrame
+            Merged tournament matchups, or matchups that have already been engineered
+        y : None
+            Ignored
+
+        Returns
+        -------
+        self : MatchupPreprocessor
+            Fitted preprocessor
+        """
+        features = self._engineered(X)
+        self.feature_names_ = list(features.columns)
+        self.scaler_ = StandardScaler().fit(features)
+
+        return self
+
+    def transform(self, X):
+        """Engineer (if needed) and scale matchups
+
+        Parameters
+        ----------
+        X : DataFrame
+            Merged tournament matchups, or matchups that have already been engineered
+
+        Returns
+        -------
+        DataFrame
+            Scaled features, in the fitted feature order
+        """
+        check_is_fitted(self, 'scaler_')
+        features = self._engineered(X)[self.feature_names_]
+
+        return pd.DataFrame(self.scaler_.transform(features), index=features.index, columns=self.feature_names_)
+
+    @staticmethod
+    def _engineered(X):
+        # Engineered matchups are left as-is; raw matchups are engineered on a copy
+        if any(col.startswith('Underdog_Rel_') for col in X.columns):
+            return X
+
+        features = X.copy()
+        engineer_matchup_features(features)
+        return features
+
+
+def get_preprocessor(fit_df):
+    """Get a fitted matchup preprocessor, fitting one only if needed
+
+    Parameters
+    ----------
+    fit_df : DataFrame or MatchupPreprocessor
+        Dataset used to fit the preprocessor, or an already fitted preprocessor
+
+    Returns
+    -------
+    MatchupPreprocessor
+        Fitted preprocessor
+    """
+    if isinstance(fit_df, MatchupPreprocessor):
+        return fit_df
+
+    return MatchupPreprocessor().fit(fit_df)
+
+
+def advance_round(teams, seeds, upsets):
+    """Advance the winners of a round to the next round; works on a batch of many brackets at once
+
+    Parameters
+    ----------
+    teams : ndarray
+        Integer team IDs of shape (..., n_games, 2); favorite first, underdog second
+    seeds : ndarray
+        Team seeds, same shape as 'teams'
+    upsets : ndarray
+        Game outcomes of shape (..., n_games); 1 if the underdog won, else 0
+
+    Returns
+    -------
+    next_teams : ndarray
+        Integer team IDs of the next round's matchups, of shape (..., n_games // 2, 2)
+    next_seeds : ndarray
+        Seeds of the next round's matchups, same shape as 'next_teams'
+    """
+    # Gather each game's winner using the upset outcome as the column index
+    picks = np.asarray(upsets, dtype=np.intp)[..., np.newaxis]
+    winners = np.take_along_axis(teams, picks, axis=-1)[..., 0]
+    winner_seeds = np.take_along_axis(seeds, picks, axis=-1)[..., 0]
+
+    # Pair up consecutive winners into the next round's matchups
+    next_shape = winners.shape[:-1] + (winners.shape[-1] // 2, 2)
+    return winners.reshape(next_shape), winner_seeds.reshape(next_shape)
+
+
 def create_bracket_round(prev_round):
     """Generate matchups of a subsequent round based on a previous round's outcomes
 
@@ -193,21 +334,20 @@ def create_bracket_round(prev_round):
     next_round : DataFrame
         Round generated from winners of 'prev_round'
     """
-    # Get teams for each matchups
-    matchups = prev_round[['Team', 'Team.1']]
-    winners = []
-
-    # Get the team data (seed & team name) from each 'prev_round' matchup
-    for index, data in prev_round.iterrows():
-        winner_seed = data['Seed'] if (data['Underdog_Upset'] == 0) else data['Seed.1']
-        # If 'Underdog_Upset' == 0 then 'Team' is the winner, else 'Team.1' is the winner
-        winner_team = matchups.iloc[index, data['Underdog_Upset']]
-        # Append a single winner to the initialized list
-        winners.append([winner_seed, winner_team])
-
-    # Reshape the n winners into n/2 matchups for a DataFrame of the subsequent round
-    winners = np.array(winners).reshape((len(winners) // 2), 4)
-    next_round = pd.DataFrame(winners, columns=['Seed', 'Team', 'Seed.1', 'Team.1'])
+    # Encode team names as integer IDs so the round can be advanced with array operations
+    team_ids, team_names = pd.factorize(prev_round[['Team', 'Team.1']].to_numpy().ravel())
+    teams = team_ids.reshape(-1, 2)
+    seeds = prev_round[['Seed', 'Seed.1']].to_numpy(dtype=int)
+
+    # If 'Underdog_Upset' == 0 then 'Team' is the winner, else 'Team.1' is the winner
+    next_teams, next_seeds = advance_round(teams, seeds, prev_round['Underdog_Upset'].to_numpy(dtype=int))
+
+    next_round = pd.DataFrame({
+        'Seed': next_seeds[:, 0],
+        'Team': team_names[next_teams[:, 0]],
+        'Seed.1': next_seeds[:, 1],
+        'Team.1': team_names[next_teams[:, 1]],
+    })
 
     return next_round
 
@@ -220,15 +360,8 @@ def create_bracket_winners(bracket):
     bracket : DataFrame
         Generated bracket predictions for current year's tournament
     """
-    winners = []
-
-    # Determine which team won, and append their name to the above list
-    for index, data in bracket.iterrows():
-        team_winner = data['Team_Underdog'] if (data['Underdog_Upset'] == 1) else data['Team_Favorite']
-        winners.append(team_winner)
-        
-    # Convert the list into a Series on the 'bracket' DataFrame
-    bracket['Winner'] = winners
+    # Determine which team won each matchup, stored as a Series on the 'bracket' DataFrame
+    bracket['Winner'] = np.where(bracket['Underdog_Upset'] == 1, bracket['Team_Underdog'], bracket['Team_Favorite'])
 
  
 def create_target_variable(mm_df):
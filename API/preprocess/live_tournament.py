@@ -0,0 +1,187 @@
+"""Live Tournament Helper Functions
+
+This script is used as a helper module in the data_pipeline script;
+also used as a module in the March_Madness_Predictions Jupyter notebooks.
+
+A live tournament is a dict holding the bracket tree level by level: level 0 holds the 64
+first round slots (filled by play-in winners where needed), and level r holds the winners of
+round r's games. Each node keeps its picked winner (the actual winner once decided) and the
+probability of each team winning it. Recording a result only recomputes the nodes above the
+decided games; all win probabilities come from the field's precomputed win matrix.
+
+The following functions are present:
+    * init_live_tournament
+    * record_result
+    * live_bracket
+    * live_advancement
+
+Requires a minimum of the 'pandas' and 'numpy' libraries, as well as the 'bracket_simulation'
+helper module, being present in your environment to run.
+"""
+
+import pandas as pd
+import numpy as np
+from bracket_simulation import orient_matchups, picks_to_bracket, advancement_table
+
+
+def init_live_tournament(field, win_matrix, threshold=0.5):
+    """Start tracking a tournament, before any games have been played
+
+    Parameters
+    ----------
+    field : dict
+        Tournament field created by create_bracket_field()
+    win_matrix : ndarray
+        Complete win probability matrix
+    threshold : float, optional
+        Upset probability above which the underdog is picked (default=0.5)
+
+    Returns
+    -------
+    tournament : dict
+        Live tournament state; updated in place by record_result()
+    """
+    n_slots, n_teams = len(field['slots']), len(field['teams'])
+    open_slots = np.flatnonzero(field['slots'] == -1)
+
+    # First round slot of every team (play-in teams share the slot their game fills)
+    team_slots = np.full(n_teams, -1)
+    filled = field['slots'] != -1
+    team_slots[field['slots'][filled]] = np.flatnonzero(filled)
+    for play_in_teams in field['play_in'].T:
+        team_slots[play_in_teams] = open_slots
+
+    # Play-in matchup feeding each slot (-1 for slots with a fixed team)
+    slot_play_in = np.full((n_slots, 2), -1)
+    slot_play_in[open_slots] = field['play_in']
+
+    tournament = {
+        'field': field,
+        'win_matrix': np.nan_to_num(win_matrix),
+        'threshold': threshold,
+        'team_ids': pd.Series(np.arange(n_teams), index=field['teams']),
+        'team_slots': team_slots,
+        'slot_play_in': slot_play_in,
+        'results': [np.full(n_slots >> level, -1) for level in range(7)],
+        'picks': [np.full(n_slots >> level, -1) for level in range(7)],
+        'win_probs': [np.zeros((n_slots >> level, n_teams)) for level in range(7)],
+    }
+
+    for level in range(7):
+        _update_nodes(tournament, level, np.arange(n_slots >> level))
+
+    return tournament
+
+
+def _update_nodes(tournament, level, nodes):
+    # Recompute the picks & win probabilities of a level's nodes from the level below (or the play-in)
+    field, win_matrix = tournament['field'], tournament['win_matrix']
+    results = tournament['results'][level][nodes]
+    win_probs = np.zeros((len(nodes), len(field['teams'])))
+
+    if level == 0:
+        team_a, team_b = tournament['slot_play_in'][nodes].T
+        fixed = team_a == -1
+        team_a = np.where(fixed, field['slots'][nodes], team_a)
+        team_b = np.where(fixed, team_a, team_b)
+        win_probs[np.arange(len(nodes)), team_a] = np.where(fixed, 1, win_matrix[team_a, team_b])
+        win_probs[np.arange(len(nodes)), team_b] += np.where(fixed, 0, win_matrix[team_b, team_a])
+    else:
+        team_a, team_b = tournament['picks'][level - 1][2 * nodes], tournament['picks'][level - 1][2 * nodes + 1]
+        left, right = tournament['win_probs'][level - 1][2 * nodes], tournament['win_probs'][level - 1][2 * nodes + 1]
+        win_probs = left * (right @ win_matrix.T) + right * (left @ win_matrix.T)
+
+    # Predicted winners, unless the game has already been decided
+    faves, underdogs = orient_matchups(field, team_a, team_b)
+    picks = np.where(win_matrix[underdogs, faves] > tournament['threshold'], underdogs, faves)
+    decided = results != -1
+    picks[decided] = results[decided]
+    win_probs[decided] = 0
+    win_probs[decided, results[decided]] = 1
+
+    tournament['picks'][level][nodes] = picks
+    tournament['win_probs'][level][nodes] = win_probs
+
+
+def record_result(tournament, winner, loser):
+    """Lock an actual game result into the tournament, updating all later predictions
+
+    Parameters
+    ----------
+    tournament : dict
+        Live tournament state created by init_live_tournament(); updated in place
+    winner : str
+        Name of the winning team (as listed in the bracket)
+    loser : str
+        Name of the losing team (as listed in the bracket)
+    """
+    for team in [winner, loser]:
+        if team not in tournament['team_ids'].index:
+            raise KeyError(f"{team} isn't in the tournament field")
+    if winner == loser:
+        raise ValueError("The winner and loser must be different teams")
+
+    winner_id, loser_id = tournament['team_ids'][[winner, loser]]
+    winner_slot, loser_slot = tournament['team_slots'][[winner_id, loser_id]]
+
+    # The teams meet where their paths through the bracket join (level 0 is a play-in game)
+    game_level = int(winner_slot ^ loser_slot).bit_length()
+    if (game_level == 0) and (tournament['slot_play_in'][winner_slot] == -1).all():
+        raise ValueError(f"{winner} and {loser} can't meet in the tournament")
+
+    # Reaching the game means both teams won every game before it
+    locks = [(level, winner_slot >> level, winner_id) for level in range(game_level + 1)]
+    locks += [(level, loser_slot >> level, loser_id) for level in range(game_level)]
+    for level, node, team in locks:
+        result = tournament['results'][level][node]
+        if (result != -1) and (result != team):
+            raise ValueError(f"Result conflicts with recorded results: {tournament['field']['teams'][result]} "
+                             f"already won that {'play-in ' if level == 0 else ''}game")
+
+    for level, node, team in locks:
+        tournament['results'][level][node] = team
+
+    # Only the decided games and the games above them need to be re-predicted
+    for level in range(7):
+        nodes = np.unique([winner_slot >> level, loser_slot >> level])
+        _update_nodes(tournament, level, nodes)
+
+
+def live_bracket(tournament):
+    """Format the live tournament as a bracket: actual results where decided, predictions elsewhere
+
+    Parameters
+    ----------
+    tournament : dict
+        Live tournament state created by init_live_tournament()
+
+    Returns
+    -------
+    bracket_preds : DataFrame
+        Complete bracket, with a 'Decided' column marking games with actual results
+    """
+    field, open_slots = tournament['field'], np.flatnonzero(tournament['field']['slots'] == -1)
+    picks = [tournament['picks'][0][open_slots]] + tournament['picks'][1:]
+    decided = [tournament['results'][0][open_slots]] + tournament['results'][1:]
+
+    bracket_preds = picks_to_bracket(field, picks)
+    bracket_preds['Decided'] = np.concatenate(decided) != -1
+
+    return bracket_preds
+
+
+def live_advancement(tournament):
+    """Compute each team's odds of advancing given the results recorded so far
+
+    Parameters
+    ----------
+    tournament : dict
+        Live tournament state created by init_live_tournament()
+
+    Returns
+    -------
+    DataFrame
+        Each team's probability of reaching each round, and of winning the title
+    """
+    reach_probs = np.array([win_probs.sum(axis=0) for win_probs in tournament['win_probs']])
+    return advancement_table(tournament['field'], reach_probs)
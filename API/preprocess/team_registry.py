@@ -0,0 +1,122 @@
+"""Team Registry Helper Functions
+
+This script is used as a helper module in the data_clean, data_pipeline, feature_engineering,
+and bracket_simulation scripts.
+
+Every source (season stats, rankings, coaches, historical & current tournaments) spells some
+team names differently. Each spelling is mapped once to the team's canonical name (its regular
+season stats spelling), and each canonical name to an integer team ID, so that teams are
+joined and looked up by integer keys rather than strings. IDs are handed out in order of
+first use, so they're only meaningful within a single Python session; they're never stored.
+
+The following functions are present:
+    * canonical_team_name
+    * team_ids
+    * team_index
+    * team_names
+
+Requires a minimum of the 'pandas' and 'numpy' libraries, as well as the 'data_integrity'
+helper module, being present in your environment to run.
+"""
+
+import threading
+import pandas as pd
+import numpy as np
+from data_integrity import coach_to_season_dict, hist_season_to_tourney_dict, curr_season_to_tourney_dict
+
+# Every known alternate spelling, mapped to its canonical (regular season stats) spelling
+team_aliases = {
+    **coach_to_season_dict,
+    **{tourney: season for season, tourney in hist_season_to_tourney_dict.items()},
+    **{tourney: season for season, tourney in curr_season_to_tourney_dict.items()},
+}
+
+# Tag marking tournament teams in the season stats tables
+ncaa_tag = '\xa0NCAA'
+
+_team_ids = {}
+_team_names = []
+_registry_lock = threading.Lock()
+
+
+def canonical_team_name(name):
+    """Get the canonical spelling of a team name from any source
+
+    Parameters
+    ----------
+    name : str
+        Team name as spelled by any source
+
+    Returns
+    -------
+    str
+        Regular season stats spelling of the team name
+    """
+    name = name.strip()
+    if name.endswith(ncaa_tag):
+        name = name[:-len(ncaa_tag)]
+
+    return team_aliases.get(name, name)
+
+
+def _team_id(name):
+    canonical_name = canonical_team_name(name)
+
+    with _registry_lock:
+        if canonical_name not in _team_ids:
+            _team_ids[canonical_name] = len(_team_names)
+            _team_names.append(canonical_name)
+
+        return _team_ids[canonical_name]
+
+
+def team_ids(names):
+    """Map team names from any source to integer team IDs
+
+    Parameters
+    ----------
+    names : list
+        Team names as spelled by any source; nulls are allowed
+
+    Returns
+    -------
+    ndarray
+        Team ID of each name (-1 for nulls)
+    """
+    # Each distinct spelling is only looked up once
+    codes, unique_names = pd.factorize(np.asarray(names, dtype=object))
+    unique_ids = np.array([_team_id(name) for name in unique_names] + [-1])
+
+    return unique_ids[codes]
+
+
+def team_index(names):
+    """Create an index of integer team IDs for a table of teams
+
+    Parameters
+    ----------
+    names : list
+        Team names as spelled by any source
+
+    Returns
+    -------
+    Index
+        Team ID of each name, named 'Team_ID'
+    """
+    return pd.Index(team_ids(names), name='Team_ID')
+
+
+def team_names(ids):
+    """Map integer team IDs back to canonical team names
+
+    Parameters
+    ----------
+    ids : list
+        Team IDs created by team_ids()
+
+    Returns
+    -------
+    ndarray
+        Canonical name of each team
+    """
+    return np.asarray(_team_names, dtype=object)[np.asarray(ids)]